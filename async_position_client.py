@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+import asyncio
+import logging
+import socket
+
+import grpc
+from arc852.grpc_support import TimeoutException
+from arc852.grpc_support import grpc_url
+from arc852.utils import setup_logging
+
+from position_client import to_record
+from proto.position_service_pb2 import ClientInfo
+from proto.position_service_pb2_grpc import PositionServiceStub
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPositionClient(object):
+    """
+    asyncio counterpart of PositionClient built on grpc.aio:
+
+        async with AsyncPositionClient("localhost") as client:
+            async for position in client.positions():
+                ...
+    """
+
+    def __init__(self, hostname, pause_secs=2.0, mid_offset_deadband=0, degrees_deadband=0, max_rate=0.0,
+                 fields=None, sources=None):
+        self.__hostname = grpc_url(hostname)
+        self.__client_info = ClientInfo(info="{0} async client".format(socket.gethostname()),
+                                        mid_offset_deadband=mid_offset_deadband,
+                                        degrees_deadband=degrees_deadband,
+                                        max_rate=max_rate,
+                                        fields=fields,
+                                        sources=sources)
+        self.__pause_secs = pause_secs
+        self.__stopped = False
+        self.__task = None
+        self.__cond = None
+        self.__latest = None
+        self.__seq = 0
+        self.__read_seq = 0
+
+    @property
+    def hostname(self):
+        return self.__hostname
+
+    @property
+    def stopped(self):
+        return self.__stopped
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def start(self):
+        # Created here so it binds to the running loop
+        self.__cond = asyncio.Condition()
+        self.__task = asyncio.ensure_future(self.__get_values())
+
+    async def stop(self):
+        self.__stopped = True
+        if self.__task is not None:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+        # Not started, so no one can be waiting
+        if self.__cond is not None:
+            async with self.__cond:
+                self.__cond.notify_all()
+
+    async def __get_values(self):
+        async with grpc.aio.insecure_channel(self.__hostname) as channel:
+            stub = PositionServiceStub(channel)
+            while not self.__stopped:
+                logger.info("Connecting to gRPC server at %s...", self.__hostname)
+                try:
+                    server_info = await stub.registerClient(self.__client_info)
+                except asyncio.CancelledError:
+                    raise
+                except BaseException as e:
+                    logger.error("Failed to connect to gRPC server at %s [%s]", self.__hostname, e)
+                    await asyncio.sleep(self.__pause_secs)
+                    continue
+
+                logger.info("Connected to gRPC server at %s [%s]", self.__hostname, server_info.info)
+                try:
+                    async for val in stub.getPositions(self.__client_info):
+                        self.__seq += 1
+                        self.__latest = to_record(self.__seq, val)
+                        async with self.__cond:
+                            self.__cond.notify_all()
+                except asyncio.CancelledError:
+                    raise
+                except BaseException as e:
+                    logger.info("Disconnected from gRPC server at %s [%s]", self.__hostname, e)
+                    await asyncio.sleep(self.__pause_secs)
+
+    async def wait_for(self, seq, timeout=None):
+        """
+        Returns the latest record once its seq is greater than seq. Raises TimeoutException after timeout
+        secs and returns None if the client is stopped.
+        """
+        val = self.__latest
+        if val is not None and val.seq > seq:
+            return val
+
+        def ready():
+            return self.__stopped or (self.__latest is not None and self.__latest.seq > seq)
+
+        async with self.__cond:
+            try:
+                await asyncio.wait_for(self.__cond.wait_for(ready), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutException
+        return None if self.__stopped else self.__latest
+
+    async def latest(self, timeout=None):
+        val = await self.wait_for(self.__read_seq, timeout)
+        if val is not None:
+            self.__read_seq = val.seq
+        return val
+
+    async def positions(self):
+        # Each iterator tracks its own position, so a slow consumer skips to the newest value
+        seq = 0
+        while not self.__stopped:
+            val = await self.wait_for(seq)
+            if val is None:
+                break
+            seq = val.seq
+            yield val
+
+
+async def read_positions(hostname, count):
+    async with AsyncPositionClient(hostname) as client:
+        async for position in client.positions():
+            logger.info("Read value:\n%s", position)
+            count -= 1
+            if count == 0:
+                break
+
+
+def main():
+    setup_logging()
+    asyncio.run(read_positions("localhost", 1000))
+    logger.info("Exiting...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+from __future__ import absolute_import
+
+import csv
+import logging
+import os
+import resource
+from timeit import default_timer
+
+import arc852.cli_args  as cli
+import cv2
+import numpy as np
+from arc852.constants import LOG_LEVEL
+from arc852.utils import setup_logging
+
+from frame_scaler import RESIZE_AREA
+from frame_scaler import RESIZE_MODES
+from headless import DisabledImageServer
+from headless import RecordingPositionServer
+from line_follower import LineFollower
+from line_follower import TRACKER_CONTOURS
+from line_follower import TRACKER_SCANLINES
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+DEFAULT_WIDTHS = "200,400,800,1200,2000"
+
+
+class ReplayCamera(object):
+    def __init__(self, frames):
+        self.__frames = frames
+        self.__pos = 0
+
+    def is_open(self):
+        return self.__pos < len(self.__frames)
+
+    def read(self):
+        frame = self.__frames[self.__pos]
+        self.__pos += 1
+        return frame
+
+    def close(self):
+        self.__pos = len(self.__frames)
+
+
+def load_frames(path, max_frames):
+    frames = []
+    if os.path.isdir(path):
+        names = sorted(name for name in os.listdir(path) if name.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:max_frames]:
+            frame = cv2.imread(os.path.join(path, name))
+            if frame is not None:
+                frames.append(frame)
+    else:
+        cap = cv2.VideoCapture(path)
+        try:
+            while len(frames) < max_frames:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                frames.append(frame)
+        finally:
+            cap.release()
+    return frames
+
+
+def max_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run(follower, frames, width):
+    follower.width = width
+    latencies = np.zeros(len(frames), dtype=np.float64)
+
+    start = default_timer()
+    for i, frame in enumerate(frames):
+        frame_start = default_timer()
+        follower.process_image(frame)
+        latencies[i] = default_timer() - frame_start
+    elapsed = default_timer() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000.0
+    return len(frames) / elapsed, p50, p95, p99
+
+
+def main():
+    # Parse CLI args
+    parser = cli.argparse.ArgumentParser()
+    parser.add_argument("-s", "--source", required=True, help="Directory of frames or video file")
+    parser.add_argument("--widths", default=DEFAULT_WIDTHS, help="Comma separated image widths [{0}]"
+                        .format(DEFAULT_WIDTHS))
+    parser.add_argument("--frames", default=500, type=int, dest="max_frames", help="Maximum frames to load [500]")
+    parser.add_argument("-o", "--positions", default=None, help="CSV file for the produced positions")
+    cli.bgr(parser)
+    parser.add_argument("-f", "--focus", default=10, type=int, dest="focus_line_pct",
+                        help="Focus line % from bottom [10]")
+    parser.add_argument("--tracker", default=TRACKER_CONTOURS, choices=[TRACKER_CONTOURS, TRACKER_SCANLINES],
+                        help="Line tracker [{0}]".format(TRACKER_CONTOURS))
+    parser.add_argument("--scanlines", default=5, type=int, dest="scanline_count",
+                        help="Number of scanlines used by the scanlines tracker [5]")
+    parser.add_argument("-n", "--midline", default=False, action="store_true", dest="report_midline",
+                        help="Report data when changes in midline [false]")
+    cli.middle_percent(parser)
+    cli.minimum_pixels(parser)
+    cli.hsv_range(parser)
+    parser.add_argument("--hsv-lut", default=False, action="store_true", dest="hsv_lut",
+                        help="Segment with a cached BGR lookup table instead of an HSV conversion [false]")
+    cli.flip_x(parser),
+    cli.flip_y(parser),
+    parser.add_argument("--resize", default=RESIZE_AREA, choices=RESIZE_MODES,
+                        help="Resize interpolation, linear is faster but aliases on large downscales [{0}]"
+                        .format(RESIZE_AREA))
+    cli.log_level(parser)
+    args = vars(parser.parse_args())
+
+    # Setup logging
+    setup_logging(level=args[LOG_LEVEL])
+
+    widths = [int(w) for w in args["widths"].split(",")]
+    invalid = [w for w in widths if not 200 <= w <= 2000]
+    if invalid:
+        parser.error("Widths must be between 200 and 2000: {0}".format(invalid))
+
+    frames = load_frames(args["source"], args["max_frames"])
+    if not frames:
+        parser.error("No frames found in {0}".format(args["source"]))
+    logger.info("Loaded %d frames from %s", len(frames), args["source"])
+
+    position_server = RecordingPositionServer()
+    follower = LineFollower(bgr_color=args["bgr_color"],
+                            focus_line_pct=args["focus_line_pct"],
+                            width=widths[0],
+                            middle_percent=args["middle_percent"],
+                            minimum_pixels=args["minimum_pixels"],
+                            hsv_range=args["hsv_range"],
+                            grpc_port=None,
+                            report_midline=args["report_midline"],
+                            display=False,
+                            usb_camera=False,
+                            flip_x=args["flip_x"],
+                            flip_y=args["flip_y"],
+                            camera_name="",
+                            leds=False,
+                            http_host=None,
+                            http_delay_secs=0,
+                            http_file=None,
+                            http_verbose=False,
+                            tracker=args["tracker"],
+                            scanline_count=args["scanline_count"],
+                            hsv_lut=args["hsv_lut"],
+                            resize=args["resize"],
+                            cam=ReplayCamera(frames),
+                            position_server=position_server,
+                            image_server=DisabledImageServer())
+
+    positions_file = open(args["positions"], "w") if args["positions"] else None
+    writer = csv.writer(positions_file) if positions_file else None
+    if writer:
+        writer.writerow(["run_width", "id", "in_focus", "mid_offset", "degrees", "mid_line_cross", "width",
+                         "middle_inc"])
+
+    try:
+        print("{0:>6} {1:>9} {2:>9} {3:>9} {4:>9} {5:>10}".format("width", "fps", "p50 ms", "p95 ms", "p99 ms",
+                                                                  "max rss mb"))
+        for width in widths:
+            position_server.positions = []
+            fps, p50, p95, p99 = run(follower, frames, width)
+            print("{0:>6} {1:>9.1f} {2:>9.2f} {3:>9.2f} {4:>9.2f} {5:>10.1f}".format(width, fps, p50, p95, p99,
+                                                                                  max_rss_mb()))
+            if writer:
+                for position in position_server.positions:
+                    writer.writerow((width,) + position)
+    finally:
+        if positions_file:
+            positions_file.close()
+
+    logger.info("Exiting...")
+
+
+if __name__ == "__main__":
+    main()
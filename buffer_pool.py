@@ -0,0 +1,69 @@
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BufferPool(object):
+    """
+    Arrays reused across frames as OpenCV dst= outputs. Each name has one flat buffer per thread and dtype,
+    grown to the largest shape asked for, and get() returns a contiguous view of its first elements, so
+    windows of changing size are served without allocating. Buffers are per thread, so frame pool threads
+    do not share them. clear() drops every thread's buffers, for a new frame size.
+    """
+
+    def __init__(self, log_secs=10.0):
+        self.__log_secs = log_secs
+        self.__last_log = time.time()
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__generation = 0
+        self.__allocations = 0
+        self.__allocated_bytes = 0
+        self.__logged_allocations = 0
+
+    @property
+    def allocations(self):
+        return self.__allocations
+
+    def clear(self):
+        # Other threads notice the new generation on their next get()
+        with self.__lock:
+            self.__generation += 1
+
+    def get(self, name, shape, dtype=np.uint8):
+        """
+        Returns an uninitialized array of shape and dtype, the same memory on every call from a thread until
+        it needs a larger one or clear() is called.
+        """
+        local = self.__local
+        if getattr(local, "generation", None) != self.__generation:
+            local.buffers = {}
+            local.generation = self.__generation
+
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape))
+        key = name, dtype
+        buf = local.buffers.get(key)
+        if buf is None or buf.size < size:
+            buf = np.empty(size, dtype=dtype)
+            local.buffers[key] = buf
+            with self.__lock:
+                self.__allocations += 1
+                self.__allocated_bytes += buf.nbytes
+        return buf[:size].reshape(shape)
+
+    def log_stats(self):
+        # A steady state loop allocates nothing between logs
+        logger.info("Buffer pool allocated %d buffers [%d KB], %d since last report",
+                    self.__allocations, self.__allocated_bytes // 1024,
+                    self.__allocations - self.__logged_allocations)
+        self.__logged_allocations = self.__allocations
+
+    def maybe_log_stats(self):
+        if self.__log_secs and time.time() - self.__last_log >= self.__log_secs:
+            self.log_stats()
+            self.__last_log = time.time()
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_DROP_OLDEST = "drop-oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_POLICIES = [OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE]
+
+
+class Subscriber(object):
+    """
+    Bounded queue for a single stream. Only touched from the event loop thread. Optional subscription
+    options (see subscription.SubscriptionFilter) drop values within their deadbands and hold back values
+    that arrive faster than their max rate, sending the newest once the interval has passed.
+    """
+
+    def __init__(self, peer, info, queue_size, overflow, options=None):
+        self.peer = peer
+        self.info = info
+        self.sent = 0
+        self.dropped = 0
+        self.filtered = 0
+        self.last_id = -1
+        self.__coalesce = overflow == OVERFLOW_COALESCE
+        self.__queue_size = queue_size
+        self.__queue = deque()
+        self.__ready = asyncio.Event()
+        self.__closed = False
+        self.__options = options
+        self.__loop = asyncio.get_event_loop() if options is not None else None
+        # Rate limiting state per source
+        self.__next_secs = {}
+        self.__pending = {}
+        self.__timers = {}
+
+    @property
+    def queued(self):
+        return len(self.__queue)
+
+    def put(self, val):
+        if self.__options is None:
+            self.__enqueue(val)
+            return
+
+        if not self.__options.wanted(val):
+            return
+
+        source = val.source
+        if not self.__options.accept(val):
+            # The newest value is within the deadbands of the last one sent, so a held back value is stale
+            if self.__pending.pop(source, None) is not None:
+                self.filtered += 1
+            self.filtered += 1
+            return
+
+        wait = self.__next_secs.get(source, 0.0) - self.__loop.time()
+        if wait > 0:
+            if source in self.__pending:
+                self.filtered += 1
+            self.__pending[source] = val
+            if source not in self.__timers:
+                self.__timers[source] = self.__loop.call_later(wait, self.__flush, source)
+            return
+
+        self.__send(val)
+
+    def __send(self, val):
+        self.__next_secs[val.source] = self.__loop.time() + self.__options.min_interval_secs
+        self.__enqueue(self.__options.sent(val))
+
+    def __flush(self, source):
+        del self.__timers[source]
+        val = self.__pending.pop(source, None)
+        if val is not None and not self.__closed:
+            self.__send(val)
+
+    def __enqueue(self, val):
+        if self.__coalesce:
+            # Keep only the newest value of each source
+            for i, queued in enumerate(self.__queue):
+                if queued.source == val.source:
+                    del self.__queue[i]
+                    self.dropped += 1
+                    break
+        elif len(self.__queue) >= self.__queue_size:
+            self.__queue.popleft()
+            self.dropped += 1
+        self.__queue.append(val)
+        self.__ready.set()
+
+    def close(self):
+        self.__closed = True
+        for timer in self.__timers.values():
+            timer.cancel()
+        self.__timers.clear()
+        self.__ready.set()
+
+    async def get(self):
+        """
+        Returns the next value, or None once the subscriber is closed.
+        """
+        while not self.__queue:
+            if self.__closed:
+                return None
+            self.__ready.clear()
+            await self.__ready.wait()
+        val = self.__queue.popleft()
+        self.sent += 1
+        self.last_id = val.id
+        return val
+
+    async def get_batch(self, max_size, max_latency_secs):
+        """
+        Waits for a first value, then up to max_latency_secs for max_size values. Returns the values queued by
+        then (at most max_size), or None once the subscriber is closed.
+        """
+        while not self.__queue:
+            if self.__closed:
+                return None
+            self.__ready.clear()
+            await self.__ready.wait()
+
+        if max_latency_secs > 0:
+            loop = asyncio.get_event_loop()
+            deadline = loop.time() + max_latency_secs
+            while len(self.__queue) < max_size and not self.__closed:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self.__ready.clear()
+                try:
+                    await asyncio.wait_for(self.__ready.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+        batch = [self.__queue.popleft() for _ in range(min(max_size, len(self.__queue)))]
+        self.sent += len(batch)
+        self.last_id = batch[-1].id
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        val = await self.get()
+        if val is None:
+            raise StopAsyncIteration
+        return val
+
+
+class Broadcaster(object):
+    """
+    Publishes each value once into a bounded queue per subscriber. publish() may be called from any thread,
+    subscribers live on the event loop passed to bind().
+    """
+
+    def __init__(self, queue_size=10, overflow=OVERFLOW_COALESCE):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Invalid overflow policy: {0}".format(overflow))
+        self.__queue_size = queue_size
+        self.__overflow = overflow
+        self.__subscribers = []
+        self.__loop = None
+        self.__latest = None
+        self.__latest_by_source = {}
+        self.published = 0
+
+    @property
+    def subscribers(self):
+        return list(self.__subscribers)
+
+    @property
+    def latest(self):
+        return self.__latest
+
+    def bind(self, loop):
+        self.__loop = loop
+
+    def subscribe(self, peer, info, queue_size=None, overflow=None, options=None):
+        subscriber = Subscriber(peer,
+                                info,
+                                queue_size if queue_size else self.__queue_size,
+                                overflow if overflow else self.__overflow,
+                                options)
+        # New subscribers start with the current value of each source
+        for val in list(self.__latest_by_source.values()):
+            subscriber.put(val)
+        self.__subscribers.append(subscriber)
+        logger.info("Added subscriber %s [%d total]", peer, len(self.__subscribers))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        if subscriber in self.__subscribers:
+            self.__subscribers.remove(subscriber)
+            subscriber.close()
+            logger.info("Removed subscriber %s [%d total]", subscriber.peer, len(self.__subscribers))
+
+    def publish(self, val):
+        self.__latest = val
+        self.__latest_by_source[val.source] = val
+        self.published += 1
+        loop = self.__loop
+        if loop is not None:
+            try:
+                # A single wakeup of the loop per value, however many subscribers there are
+                loop.call_soon_threadsafe(self.__fanout, val)
+            except RuntimeError:
+                # Loop closed during shutdown
+                pass
+
+    def __fanout(self, val):
+        for subscriber in self.__subscribers:
+            subscriber.put(val)
+
+    def close(self):
+        for subscriber in self.__subscribers:
+            subscriber.close()
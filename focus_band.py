@@ -0,0 +1,43 @@
+import logging
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+class FocusBand(object):
+    def __init__(self, minimum_pixels, half_height=5):
+        self.__minimum_pixels = minimum_pixels
+        self.__half_height = half_height
+
+    @property
+    def half_height(self):
+        return self.__half_height
+
+    def bounds(self, img_height, focus_line_y):
+        top = max(focus_line_y - self.__half_height, 0)
+        bottom = min(focus_line_y + self.__half_height + 1, img_height)
+        return top, bottom
+
+    def get_centroid(self, mask, focus_line_y):
+        """
+        Returns the x centroid of the largest target blob in the rows around focus_line_y, or None.
+        """
+        top, bottom = self.bounds(mask.shape[0], focus_line_y)
+        if top >= bottom:
+            return None
+
+        # Slicing rows of a C-contiguous mask is a view, so no pixels are copied
+        band = mask[top:bottom]
+
+        # Per-blob areas and centroids come from the moments of each connected component
+        cnt, labels, stats, centroids = cv2.connectedComponentsWithStats(band, connectivity=8)
+        if cnt < 2:
+            return None
+
+        # Label 0 is the background
+        largest = 1 + stats[1:, cv2.CC_STAT_AREA].argmax()
+        if stats[largest, cv2.CC_STAT_AREA] < self.__minimum_pixels:
+            return None
+
+        return int(centroids[largest, 0])
@@ -0,0 +1,89 @@
+import logging
+import time
+from threading import Condition
+from threading import Thread
+
+logger = logging.getLogger(__name__)
+
+
+class FrameGrabber(object):
+    def __init__(self, cam, log_secs=10.0):
+        self.__cam = cam
+        self.__log_secs = log_secs
+        self.__cond = Condition()
+        self.__frame = None
+        self.__stopped = False
+        self.__thread = None
+
+        self.__captured = 0
+        self.__processed = 0
+        self.__dropped = 0
+        self.__start_time = None
+
+    @property
+    def dropped(self):
+        return self.__dropped
+
+    def is_open(self):
+        return not self.__stopped and self.__cam.is_open()
+
+    def start(self):
+        self.__start_time = time.time()
+        self.__thread = Thread(target=self.__capture, name="FrameGrabber")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        with self.__cond:
+            self.__stopped = True
+            self.__cond.notify_all()
+        if self.__thread is not None:
+            self.__thread.join(2.0)
+
+    def __capture(self):
+        last_log = time.time()
+        while not self.__stopped and self.__cam.is_open():
+            try:
+                frame = self.__cam.read()
+                capture_wall, capture_mono = time.time(), time.monotonic()
+            except BaseException as e:
+                logger.error("Unable to read frame [%s]", e, exc_info=True)
+                time.sleep(1)
+                continue
+
+            with self.__cond:
+                # Only the latest frame is kept, an unread frame is dropped
+                if self.__frame is not None:
+                    self.__dropped += 1
+                self.__frame = frame, capture_wall, capture_mono
+                self.__captured += 1
+                self.__cond.notify()
+
+            if self.__log_secs and time.time() - last_log >= self.__log_secs:
+                self.log_stats()
+                last_log = time.time()
+
+    # Blocking
+    def read(self, timeout=None):
+        """
+        Returns (frame, capture_wall, capture_mono) for the newest unread frame, or None after timeout secs.
+        """
+        with self.__cond:
+            if self.__frame is None and not self.__stopped:
+                self.__cond.wait(timeout)
+            frame = self.__frame
+            self.__frame = None
+            if frame is not None:
+                self.__processed += 1
+            return frame
+
+    def stats(self):
+        elapsed = max(time.time() - self.__start_time, 1e-6) if self.__start_time else None
+        return {"capture_fps": self.__captured / elapsed if elapsed else 0.0,
+                "process_fps": self.__processed / elapsed if elapsed else 0.0,
+                "dropped": self.__dropped}
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info("Capture %.1f fps, process %.1f fps, %d frames dropped",
+                    stats["capture_fps"], stats["process_fps"], stats["dropped"])
@@ -0,0 +1,111 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+import numpy as np
+
+from profiler import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class OrderedFramePool(object):
+    """
+    Runs fn on frames in worker threads (OpenCV releases the GIL) and releases the results in frame order.
+    A frame that is still running max_wait_secs after it was submitted, while a newer one is done, is
+    skipped and its result discarded when it arrives, so one slow frame does not hold back the rest.
+    """
+
+    def __init__(self, fn, workers, max_pending=None, max_wait_secs=0.1, log_secs=10.0):
+        self.__fn = fn
+        self.__executor = ThreadPoolExecutor(max_workers=workers)
+        self.__max_pending = max_pending if max_pending else 2 * workers
+        self.__max_wait_secs = max_wait_secs
+        self.__log_secs = log_secs
+        self.__last_log = time.monotonic()
+        self.__pending = deque()
+        self.__frame_id = 0
+        self.__done_secs = {}
+        self.__reorder_secs = RingBuffer(256)
+        self.__released = 0
+        self.__discarded = 0
+
+    def __done(self, frame_id):
+        def callback(future):
+            self.__done_secs[frame_id] = time.monotonic()
+
+        return callback
+
+    # Blocking
+    def submit(self, *args):
+        """
+        Queues fn(*args) for the next frame id, waiting while max_pending frames are outstanding. Returns the
+        [(frame_id, result), ...] now ready, in frame order.
+        """
+        self.__frame_id += 1
+        future = self.__executor.submit(self.__fn, *args)
+        future.add_done_callback(self.__done(self.__frame_id))
+        self.__pending.append((self.__frame_id, time.monotonic(), future))
+
+        released = self.__release()
+        while len(self.__pending) >= self.__max_pending:
+            wait([p[2] for p in self.__pending], timeout=self.__max_wait_secs, return_when=FIRST_COMPLETED)
+            released.extend(self.__release())
+
+        if self.__log_secs and time.monotonic() - self.__last_log >= self.__log_secs:
+            self.log_stats()
+            self.__last_log = time.monotonic()
+        return released
+
+    def __release(self):
+        released = []
+        now = time.monotonic()
+        while self.__pending:
+            frame_id, submit_secs, future = self.__pending[0]
+            if future.done():
+                self.__pending.popleft()
+                self.__reorder_secs.add(now - self.__done_secs.pop(frame_id, now))
+                try:
+                    released.append((frame_id, future.result()))
+                except BaseException as e:
+                    # One failed frame must not lose the frames already released with it
+                    logger.error("Unable to measure frame %d [%s]", frame_id, e, exc_info=True)
+                    self.__discarded += 1
+            elif now - submit_secs > self.__max_wait_secs and any(p[2].done() for p in self.__pending):
+                # Stale, newer frames are ready
+                self.__pending.popleft()
+                future.add_done_callback(lambda f, frame_id=frame_id: self.__done_secs.pop(frame_id, None))
+                self.__discarded += 1
+            else:
+                break
+        self.__released += len(released)
+        return released
+
+    # Blocking
+    def drain(self):
+        """
+        Waits for the outstanding frames and returns their [(frame_id, result), ...] in frame order.
+        """
+        wait([p[2] for p in self.__pending])
+        return self.__release()
+
+    def shutdown(self):
+        self.__executor.shutdown(wait=True)
+        self.__pending.clear()
+
+    def stats(self):
+        """
+        Returns (released, discarded, p50 reorder ms, p95 reorder ms). Reorder time is how long a finished
+        frame waited for the frames before it.
+        """
+        values = self.__reorder_secs.values()
+        if len(values) == 0:
+            return self.__released, self.__discarded, 0.0, 0.0
+        p50, p95 = np.percentile(values, [50, 95]) * 1000
+        return self.__released, self.__discarded, float(p50), float(p95)
+
+    def log_stats(self):
+        logger.info("Frame pool released %d, discarded %d, reorder p50 %.2f ms p95 %.2f ms", *self.stats())
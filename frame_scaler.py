@@ -0,0 +1,90 @@
+import logging
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+RESIZE_AREA = "area"
+RESIZE_LINEAR = "linear"
+RESIZE_MODES = [RESIZE_AREA, RESIZE_LINEAR]
+
+INTERPOLATIONS = {RESIZE_AREA: cv2.INTER_AREA, RESIZE_LINEAR: cv2.INTER_LINEAR}
+
+
+def flip_code(flip_x, flip_y):
+    """
+    Returns the cv2.flip() code doing both flips in one pass, or None if neither is set.
+    """
+    if flip_x and flip_y:
+        return -1
+    if flip_x:
+        return 0
+    if flip_y:
+        return 1
+    return None
+
+
+class FrameScaler(object):
+    """
+    Brings frames to the target width and orientation with as few full-frame copies as possible. Cameras
+    with set_resolution(width, height) and set_flip(flip_x, flip_y) are asked to deliver frames that way,
+    and frames already at the target width are not resized. Otherwise a frame is resized, by default with
+    INTER_AREA like imutils.resize(), and then flipped once for both axes, in place. RESIZE_LINEAR is several
+    times faster but aliases on large downscales, which can change how thin lines segment. scale() keeps no
+    per-frame state, so frames can be scaled in parallel. With buffers from a BufferPool, the scaled frame is
+    overwritten by the next frame scaled in the same thread.
+    """
+
+    def __init__(self, flip_x=False, flip_y=False, resize=RESIZE_AREA, buffers=None):
+        if resize not in INTERPOLATIONS:
+            raise ValueError("Invalid resize mode: {0}".format(resize))
+        self.__interpolation = INTERPOLATIONS[resize]
+        self.__buffers = buffers
+        self.__flip_x = flip_x
+        self.__flip_y = flip_y
+        self.__flip_code = flip_code(flip_x, flip_y)
+        self.__capture_size = None
+
+    def configure_camera(self, cam, width, frame_shape=None):
+        """
+        Asks cam to capture at width, keeping the aspect of frame_shape, and in the configured orientation,
+        if it supports it. Returns True if the camera now captures at width.
+        """
+        if self.__flip_code is not None and hasattr(cam, "set_flip"):
+            try:
+                cam.set_flip(self.__flip_x, self.__flip_y)
+                self.__flip_code = None
+                logger.info("Camera flips frames")
+            except BaseException as e:
+                logger.warning("Unable to flip frames in camera [%s]", e)
+
+        if frame_shape is None or not hasattr(cam, "set_resolution"):
+            return False
+        height = int(frame_shape[0] * (width / float(frame_shape[1])))
+        if self.__capture_size == (width, height):
+            return True
+        try:
+            cam.set_resolution(width, height)
+            self.__capture_size = width, height
+            logger.info("Camera captures at %dx%d", width, height)
+            return True
+        except BaseException as e:
+            logger.warning("Unable to capture at %dx%d [%s]", width, height, e)
+            return False
+
+    def scale(self, image, width):
+        """
+        Returns image resized to width and flipped, the same image if neither is needed.
+        """
+        height, img_width = image.shape[:2]
+        buffers = self.__buffers
+        if img_width != width:
+            dsize = width, int(height * (width / float(img_width)))
+            dst = buffers.get("scaled", (dsize[1], dsize[0]) + image.shape[2:]) if buffers else None
+            image = cv2.resize(image, dsize, dst=dst, interpolation=self.__interpolation)
+            if self.__flip_code is not None:
+                # The resized frame is our own, so it can be flipped in place
+                image = cv2.flip(image, self.__flip_code, dst=image)
+        elif self.__flip_code is not None:
+            image = cv2.flip(image, self.__flip_code, dst=buffers.get("scaled", image.shape) if buffers else None)
+        return image
@@ -0,0 +1,125 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+FrameGeometry = namedtuple("FrameGeometry", "mid_x mid_y mid_inc focus_line_y")
+LineGeometry = namedtuple("LineGeometry", "y_inter focus_line_inter mid_line_inter mid_line_cross")
+
+
+def slope_degrees(slope):
+    # Matches the convention of arc852.opencv_utils.contour_slope_degrees()
+    if slope is None:
+        return 90
+    return int(math.degrees(math.atan(slope))) * -1
+
+
+def frame_geometry(img_width, img_height, focus_line_pct, percent):
+    middle_pct = (percent / 100.0) / 2
+    mid_x = img_width // 2
+    mid_y = img_height // 2
+    mid_inc = int(mid_x * middle_pct)
+    focus_line_y = int(img_height - (img_height * (focus_line_pct / 100.0)))
+    return FrameGeometry(mid_x, mid_y, mid_inc, focus_line_y)
+
+
+def line_geometry(slope, img_x, img_y, focus_line_y, mid_x, mid_y):
+    """
+    slope is None for a vertical line. mid_line_cross is None when the line does not cross the x midpoint
+    and -1 when it crosses below the focus line.
+    """
+    focus_line_inter = None
+    mid_line_inter = None
+    mid_line_cross = None
+
+    y_inter = None if slope is None else int(img_y - (slope * img_x))
+
+    # Calculate point where line intersects focus line
+    if slope != 0:
+        focus_line_inter = int((focus_line_y - y_inter) / slope) if y_inter is not None else img_x
+
+    # Calculate point where line intersects x midpoint
+    if slope is None:
+        # Vertical line
+        if focus_line_inter == mid_x:
+            mid_line_inter = mid_y
+    else:
+        # Non-vertical line
+        mid_line_inter = int((slope * mid_x) + y_inter)
+
+    if mid_line_inter is not None:
+        mid_line_cross = focus_line_y - mid_line_inter
+        mid_line_cross = mid_line_cross if mid_line_cross > 0 else -1
+
+    return LineGeometry(y_inter, focus_line_inter, mid_line_inter, mid_line_cross)
+
+
+def position_fields(focus_img_x, degrees, mid_line_cross, img_width, mid_x, mid_inc):
+    """
+    Returns the (in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc) arguments of
+    PositionServer.write_position().
+    """
+    return (focus_img_x is not None,
+            focus_img_x - mid_x if focus_img_x is not None else 0,
+            degrees,
+            mid_line_cross if mid_line_cross is not None else -1,
+            img_width,
+            mid_inc)
+
+
+def compute_position(focus_img_x, line, img_width, img_height, focus_line_pct, percent):
+    """
+    line is (slope, degrees, img_x, img_y) from a tracker, or None if no line was found.
+    """
+    frame = frame_geometry(img_width, img_height, focus_line_pct, percent)
+    degrees = None
+    mid_line_cross = None
+    if line is not None:
+        slope, degrees, img_x, img_y = line
+        geometry = line_geometry(slope, img_x, img_y, frame.focus_line_y, frame.mid_x, frame.mid_y)
+        mid_line_cross = geometry.mid_line_cross
+    return position_fields(focus_img_x, degrees, mid_line_cross, img_width, frame.mid_x, frame.mid_inc)
+
+
+def compute_positions(focus_img_x, slope, degrees, img_x, img_y, img_width, img_height, focus_line_pct, percent):
+    """
+    Vectorized compute_position() over N frames. All arguments are arrays (or scalars) broadcastable to N.
+    A NaN focus_img_x means the focus line was missed, a NaN img_x means no line was found and a NaN slope
+    means a vertical line. Returns a dict of int32/bool arrays keyed by Position field name.
+    """
+    focus_img_x = np.asarray(focus_img_x, dtype=np.float64)
+    slope = np.asarray(slope, dtype=np.float64)
+    img_x = np.asarray(img_x, dtype=np.float64)
+    img_y = np.asarray(img_y, dtype=np.float64)
+    img_width = np.asarray(img_width, dtype=np.int64)
+    img_height = np.asarray(img_height, dtype=np.int64)
+
+    mid_x = img_width // 2
+    mid_y = img_height // 2
+    mid_inc = np.trunc(mid_x * ((np.asarray(percent) / 100.0) / 2)).astype(np.int64)
+    focus_line_y = np.trunc(img_height - (img_height * (np.asarray(focus_line_pct) / 100.0))).astype(np.int64)
+
+    has_line = ~np.isnan(img_x)
+    vertical = np.isnan(slope)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        y_inter = np.trunc(img_y - (slope * img_x))
+        focus_line_inter = np.where(vertical, np.trunc(img_x), np.trunc((focus_line_y - y_inter) / slope))
+        mid_line_inter = np.where(vertical, mid_y, np.trunc((slope * mid_x) + y_inter))
+
+    # A vertical line only crosses the x midpoint if it lies on it
+    crosses = has_line & (~vertical | (focus_line_inter == mid_x))
+    mid_line_cross = np.where(crosses, focus_line_y - np.where(crosses, mid_line_inter, 0), -1)
+    mid_line_cross = np.where(mid_line_cross > 0, mid_line_cross, -1)
+
+    in_focus = ~np.isnan(focus_img_x)
+    mid_offset = np.where(in_focus, np.where(in_focus, focus_img_x, 0) - mid_x, 0)
+    degrees = np.where(has_line, np.nan_to_num(np.asarray(degrees, dtype=np.float64)), 0)
+
+    shape = np.broadcast(in_focus, has_line, img_width).shape
+    return {"in_focus": np.broadcast_to(in_focus, shape),
+            "mid_offset": np.broadcast_to(mid_offset, shape).astype(np.int32),
+            "degrees": np.broadcast_to(degrees, shape).astype(np.int32),
+            "mid_line_cross": np.broadcast_to(mid_line_cross, shape).astype(np.int32),
+            "width": np.broadcast_to(img_width, shape).astype(np.int32),
+            "middle_inc": np.broadcast_to(mid_inc, shape).astype(np.int32)}
@@ -0,0 +1,33 @@
+class RecordingPositionServer(object):
+    """
+    Stands in for PositionServer and keeps every position written, for replaying frames without gRPC.
+    """
+
+    def __init__(self):
+        self.id = 0
+        self.positions = []
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def write_position(self, in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc,
+                       capture_wall=0.0, capture_mono=0.0, processed_mono=0.0):
+        self.positions.append((self.id, in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc))
+        self.id += 1
+
+
+class DisabledImageServer(object):
+    """
+    Stands in for the HTTP ImageServer when no one views the images, so the overlay is never drawn.
+    """
+    enabled = False
+    image = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
@@ -0,0 +1,90 @@
+import logging
+import os
+
+import cv2
+import numpy as np
+
+from hsv_threshold import hsv_bounds
+from hsv_threshold import parse_bgr
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "line-following")
+
+
+class HsvLut(object):
+    """
+    Segments a BGR image with a precomputed BGR -> in-range table instead of an HSV conversion per frame.
+    Each channel is quantized to bits, so the table has 2 ** (3 * bits) entries.
+    """
+
+    def __init__(self, bgr_color, hsv_range, bits=6, cache_dir=DEFAULT_CACHE_DIR, buffers=None):
+        if not 1 <= bits <= 8:
+            raise ValueError("bits must be between 1 and 8")
+        self.__bgr = parse_bgr(bgr_color)
+        self.__hsv_range = hsv_range
+        self.__bits = bits
+        self.__shift = 8 - bits
+        self.__cache_dir = cache_dir
+        self.__buffers = buffers
+        self.__lut = self.__load()
+
+    @property
+    def cache_file(self):
+        name = "hsv_lut_{0}_{1}_{2}_{3}_{4}.npy".format(self.__bgr[0], self.__bgr[1], self.__bgr[2],
+                                                        self.__hsv_range, self.__bits)
+        return os.path.join(self.__cache_dir, name)
+
+    def __load(self):
+        path = self.cache_file
+        if os.path.exists(path):
+            try:
+                lut = np.load(path)
+                if lut.shape == (1 << (3 * self.__bits),) and lut.dtype == np.uint8:
+                    logger.info("Loaded HSV lookup table from %s", path)
+                    return lut
+                logger.warning("Ignoring malformed HSV lookup table %s", path)
+            except BaseException as e:
+                logger.warning("Unable to read HSV lookup table %s [%s]", path, e)
+
+        lut = self.__build()
+
+        try:
+            if not os.path.isdir(self.__cache_dir):
+                os.makedirs(self.__cache_dir)
+            np.save(path, lut)
+            logger.info("Saved HSV lookup table to %s", path)
+        except BaseException as e:
+            logger.warning("Unable to save HSV lookup table to %s [%s]", path, e)
+        return lut
+
+    def __build(self):
+        bits = self.__bits
+        levels = 1 << bits
+        # Sample the middle of each quantization bucket
+        half = (1 << self.__shift) >> 1
+        index = np.arange(levels ** 3, dtype=np.uint32)
+        b = ((index >> (2 * bits)) & (levels - 1)) << self.__shift | half
+        g = ((index >> bits) & (levels - 1)) << self.__shift | half
+        r = (index & (levels - 1)) << self.__shift | half
+        bgr_img = np.dstack([b, g, r]).astype(np.uint8)
+
+        lower, upper = hsv_bounds(self.__bgr, self.__hsv_range)
+        hsv_img = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2HSV)
+        return cv2.inRange(hsv_img, lower, upper).ravel()
+
+    def mask(self, image):
+        buffers = self.__buffers
+        if not buffers:
+            quantized = image >> self.__shift if self.__shift else image
+            index = quantized[..., 0].astype(np.uint32)
+        else:
+            quantized = np.right_shift(image, self.__shift, out=buffers.get("quantized", image.shape)) \
+                if self.__shift else image
+            index = buffers.get("index", image.shape[:2], np.uint32)
+            np.copyto(index, quantized[..., 0])
+        index <<= self.__bits
+        index |= quantized[..., 1]
+        index <<= self.__bits
+        index |= quantized[..., 2]
+        return np.take(self.__lut, index, out=buffers.get("mask", image.shape[:2]) if buffers else None)
@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+
+
+def parse_bgr(bgr_color):
+    if isinstance(bgr_color, str):
+        bgr_color = [int(v) for v in bgr_color.strip("[]() ").split(",")]
+    return tuple(int(v) for v in bgr_color)
+
+
+def hsv_bounds(bgr_color, hsv_range):
+    # Same bounds ContourFinder derives from the target color
+    bgr_img = np.uint8([[parse_bgr(bgr_color)]])
+    hsv_value = int(cv2.cvtColor(bgr_img, cv2.COLOR_BGR2HSV)[0, 0, 0])
+    lower = np.array([hsv_value - hsv_range, 100, 100])
+    upper = np.array([hsv_value + hsv_range, 255, 255])
+    return lower, upper
+
+
+def threshold(image, lower, upper, buffers=None):
+    """
+    Returns the in-range mask of image, written to buffers from a BufferPool if given.
+    """
+    hsv_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=buffers.get("hsv", image.shape) if buffers else None)
+    return cv2.inRange(hsv_image, lower, upper, dst=buffers.get("mask", image.shape[:2]) if buffers else None)
+
+
+def max_contours(mask, minimum_pixels, count=1, offset=(0, 0)):
+    # OpenCV 3 returns (image, contours, hierarchy) and OpenCV 4 returns (contours, hierarchy)
+    contours = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset)[-2]
+    eligible = [c for c in contours if cv2.contourArea(c) >= minimum_pixels]
+    return sorted(eligible, key=cv2.contourArea, reverse=True)[:count]
+
+
+class HsvThreshold(object):
+    def __init__(self, bgr_color, hsv_range, buffers=None):
+        self.__lower, self.__upper = hsv_bounds(bgr_color, hsv_range)
+        self.__buffers = buffers
+
+    def mask(self, image):
+        # The mask is overwritten by the next call from the same thread when buffers are pooled
+        return threshold(image, self.__lower, self.__upper, self.__buffers)
+
+
+class MaskContourFinder(object):
+    """
+    Same interface as ContourFinder.get_max_contours(), but takes an already segmented mask.
+    """
+
+    def __init__(self, minimum_pixels):
+        self.__minimum_pixels = minimum_pixels
+
+    def get_max_contours(self, mask, count=1, offset=(0, 0)):
+        """
+        offset is added to the contour points, for a mask of a window into the image.
+        """
+        return max_contours(mask, self.__minimum_pixels, count, offset)
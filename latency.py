@@ -0,0 +1,67 @@
+import logging
+import socket
+from threading import Lock
+
+import numpy as np
+
+from profiler import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1", "[::1]")
+
+STAGES = ["capture_to_receive", "capture_to_processed", "processed_to_published", "published_to_receive"]
+
+
+def is_local_host(url):
+    host = url.rsplit(":", 1)[0] if url.count(":") == 1 or url.startswith("[") else url
+    return host in LOCAL_HOSTS or host == socket.gethostname()
+
+
+class LatencyTracker(object):
+    """
+    Collects capture -> receive latency of PositionRecords. Monotonic clocks are only comparable on the same
+    host, so remote clients fall back to wall clock time for the end to end and publish -> receive stages.
+    """
+
+    def __init__(self, local, size=1024):
+        self.__local = local
+        self.__lock = Lock()
+        self.__rings = dict((stage, RingBuffer(size)) for stage in STAGES)
+
+    def add(self, record):
+        # Servers without timestamps leave them at 0
+        if not record.capture_mono:
+            return
+
+        if self.__local:
+            capture_to_receive = record.received_mono - record.capture_mono
+            published_to_receive = record.received_mono - record.published_mono
+        else:
+            capture_to_receive = record.received_wall - record.capture_wall
+            published_to_receive = capture_to_receive - (record.published_mono - record.capture_mono)
+
+        with self.__lock:
+            self.__rings["capture_to_receive"].add(capture_to_receive)
+            self.__rings["capture_to_processed"].add(record.processed_mono - record.capture_mono)
+            self.__rings["processed_to_published"].add(record.published_mono - record.processed_mono)
+            self.__rings["published_to_receive"].add(published_to_receive)
+
+    def report(self):
+        """
+        Returns [(stage, count, p50_ms, p95_ms, p99_ms), ...] over the most recent positions.
+        """
+        with self.__lock:
+            snapshot = [(stage, self.__rings[stage].count, self.__rings[stage].values()) for stage in STAGES]
+
+        report = []
+        for stage, count, values in snapshot:
+            if not len(values):
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000.0
+            report.append((stage, count, float(p50), float(p95), float(p99)))
+        return report
+
+    def log_report(self):
+        for stage, count, p50, p95, p99 in self.report():
+            logger.info("  %-22s p50 %7.2f ms  p95 %7.2f ms  p99 %7.2f ms", stage, p50, p95, p99)
@@ -3,18 +3,16 @@ from __future__ import absolute_import
 
 import logging
 import sys
+from collections import namedtuple
 
 import arc852.cli_args  as cli
 import arc852.image_server as img_server
 import arc852.opencv_defaults as defs
 import arc852.opencv_utils as utils
 import cv2
-import imutils
-import numpy as np
 import time
 from arc852.camera import Camera
 from arc852.constants import LOG_LEVEL
-from arc852.contour_finder import ContourFinder
 from arc852.opencv_utils import BLUE
 from arc852.opencv_utils import GREEN
 from arc852.opencv_utils import RED
@@ -23,7 +21,31 @@ from arc852.opencv_utils import get_moment
 from arc852.utils import setup_logging
 from arc852.utils import strip_loglevel
 
+from buffer_pool import BufferPool
+from fanout import OVERFLOW_COALESCE
+from fanout import OVERFLOW_POLICIES
+from focus_band import FocusBand
+from frame_grabber import FrameGrabber
+from frame_pool import OrderedFramePool
+from frame_scaler import FrameScaler
+from frame_scaler import RESIZE_AREA
+from frame_scaler import RESIZE_MODES
+from geometry import frame_geometry
+from geometry import line_geometry
+from geometry import position_fields
+from overlay import Overlay
+from position_filter import FILTERS
+from position_filter import PositionFilter
+from hsv_lut import HsvLut
+from hsv_threshold import HsvThreshold
+from hsv_threshold import MaskContourFinder
 from position_server import PositionServer
+from profiler import NullProfiler
+from profiler import StageProfiler
+from resolution_controller import ResolutionController
+from scanline_tracker import ScanlineTracker
+from search_window import SearchWindow
+from search_window import touches_edge
 
 # I tried to include this in the constructor and make it depedent on self.__leds, but it does not work
 # if is_raspi():
@@ -31,6 +53,29 @@ from position_server import PositionServer
 
 logger = logging.getLogger(__name__)
 
+TRACKER_CONTOURS = "contours"
+TRACKER_SCANLINES = "scanlines"
+
+# Result of LineFollower.measure(), contour is None and centroids empty when not found or not used.
+# window is the (x0, y0, x1, y1) searched, or None for a full frame.
+Measurement = namedtuple("Measurement", "image frame focus_img_x line contour centroids window")
+
+
+def draw_status(image, cnt, img_width, img_height, percent, line_found, focus_img_x, mid_x, degrees,
+                mid_line_cross):
+    text = "#{0} ({1}, {2}) {0}%".format(cnt, img_width, img_height, percent)
+
+    if line_found:
+        if focus_img_x is not None:
+            text += " Pos: {0}".format(focus_img_x - mid_x)
+
+        text += " Angle: {0}".format(degrees)
+
+        if mid_line_cross is not None and mid_line_cross != -1:
+            text += " Mid cross: {0}".format(mid_line_cross)
+
+    cv2.putText(image, text, defs.TEXT_LOC, defs.TEXT_FONT, defs.TEXT_SIZE, RED, 1)
+
 
 class LineFollower(object):
     def __init__(self,
@@ -51,7 +96,26 @@ class LineFollower(object):
                  http_host,
                  http_delay_secs,
                  http_file,
-                 http_verbose):
+                 http_verbose,
+                 tracker=TRACKER_CONTOURS,
+                 scanline_count=5,
+                 capture_thread=False,
+                 profile=False,
+                 hsv_lut=False,
+                 target_fps=None,
+                 queue_size=10,
+                 overflow=OVERFLOW_COALESCE,
+                 shm=False,
+                 smoothing=None,
+                 coast_secs=0.2,
+                 lead_ms=0,
+                 workers=0,
+                 search_window=False,
+                 window_margin=30,
+                 resize=RESIZE_AREA,
+                 cam=None,
+                 position_server=None,
+                 image_server=None):
         self.__focus_line_pct = focus_line_pct
         self.__width = width
         self.__orig_width = width
@@ -60,20 +124,54 @@ class LineFollower(object):
         self.__report_midline = report_midline
         self.__display = display
         self.__leds = leds
-        self.__flip_x = flip_x
-        self.__flip_y = flip_y
         self.__camera_name = camera_name
+        self.__tracker = tracker
         self.__stopped = False
 
         self.__prev_focus_img_x = -1
         self.__prev_mid_line_cross = -1
+        self.__prev_filtered = None
 
         self.__cnt = 0
 
-        self.__contour_finder = ContourFinder(bgr_color, hsv_range, minimum_pixels)
-        self.__position_server = PositionServer(grpc_port)
-        self.__cam = Camera(usb_camera=usb_camera)
-        self.__image_server = img_server.ImageServer(http_file, camera_name, http_host, http_delay_secs, http_verbose)
+        self.__http_delay_secs = http_delay_secs
+        self.__last_http_secs = 0
+
+        # Per-frame intermediates are written to reused buffers, one set per measuring thread
+        self.__buffers = BufferPool()
+        # Each frame is segmented once, and the focus band and full-frame passes both search that mask
+        self.__segmenter = HsvLut(bgr_color, hsv_range, buffers=self.__buffers) if hsv_lut \
+            else HsvThreshold(bgr_color, hsv_range, buffers=self.__buffers)
+        self.__contour_finder = MaskContourFinder(minimum_pixels)
+        self.__focus_band = FocusBand(minimum_pixels)
+        self.__search_window = SearchWindow(window_margin) if search_window else None
+        if tracker == TRACKER_SCANLINES:
+            self.__scanline_tracker = ScanlineTracker(self.__segmenter, scanline_count, minimum_pixels,
+                                                    buffers=self.__buffers)
+        self.__profiler = StageProfiler() if profile else NullProfiler()
+        self.__null_profiler = NullProfiler()
+        self.__resolution_controller = ResolutionController(target_fps, width) if target_fps else None
+        self.__position_filter = PositionFilter(smoothing, coast_secs, lead_ms / 1000.0) if smoothing else None
+        self.__position_server = position_server if position_server else PositionServer(grpc_port,
+                                                                                          profiler=self.__profiler,
+                                                                                          queue_size=queue_size,
+                                                                                          overflow=overflow,
+                                                                                          shm=shm)
+        self.__cam = cam if cam else Camera(usb_camera=usb_camera)
+        # Scaled frames are still in use after measure() returns, so the frame pool does not reuse them
+        self.__scaler = FrameScaler(flip_x, flip_y, resize, buffers=self.__buffers if workers <= 1 else None)
+        self.__capture_width = None
+        self.__grabber = FrameGrabber(self.__cam) if capture_thread else None
+        # Frames are measured in parallel, then reported in capture order from the loop thread
+        self.__frame_pool = OrderedFramePool(self.__measure_frame, workers) if workers > 1 else None
+        self.__workers = workers
+        self.__image_server = image_server if image_server else img_server.ImageServer(http_file,
+                                                                                       camera_name,
+                                                                                       http_host,
+                                                                                       http_delay_secs,
+                                                                                       http_verbose)
+        # Headless robots skip recording the overlay altogether
+        self.__overlay = Overlay(enabled=display or self.__image_server.enabled)
 
     @property
     def focus_line_pct(self):
@@ -94,6 +192,15 @@ class LineFollower(object):
             self.__width = width
             self.__prev_focus_img_x = None
             self.__prev_mid_line_cross = None
+            self.__prev_filtered = None
+            if self.__resolution_controller:
+                self.__resolution_controller.width = width
+            # Offsets are in pixels, so filter state does not carry over to a new width
+            if self.__position_filter:
+                self.__position_filter.reset()
+            if self.__search_window:
+                self.__search_window.reset()
+            self.__buffers.clear()
 
     @property
     def percent(self):
@@ -105,6 +212,201 @@ class LineFollower(object):
             self.__percent = percent
             self.__prev_focus_img_x = None
             self.__prev_mid_line_cross = None
+            self.__prev_filtered = None
+
+    def measure(self, image, profiler):
+        """
+        Resizes, flips and tracks a frame without touching per-frame state, so frames can be measured in
+        parallel. Drawing and publishing are left to report().
+        """
+        scaled = self.__scaler.scale(image, self.__width)
+        if scaled is image and self.__overlay.enabled:
+            # Frames captured at the target width are not copied, but the overlay is drawn in place
+            scaled = image.copy()
+        image = scaled
+        profiler.lap("resize")
+
+        img_height, img_width = image.shape[:2]
+
+        frame = frame_geometry(img_width, img_height, self.__focus_line_pct, self.__percent)
+        focus_img_x = None
+        line = None
+        contour = None
+        centroids = []
+        window = None
+
+        if self.__tracker == TRACKER_SCANLINES:
+            centroids, focus_img_x, line = self.__scanline_tracker.track(image, frame.focus_line_y)
+        else:
+            if self.__search_window:
+                focus_y0, focus_y1 = self.__focus_band.bounds(img_height, frame.focus_line_y)
+                window = self.__search_window.window(img_width, img_height, focus_y0, focus_y1)
+            if window is not None:
+                focus_img_x, contour, line = self.__find_line(image, frame.focus_line_y, window)
+                # Reacquire over the full frame when the line is lost or may continue outside the window
+                if focus_img_x is None or contour is None or touches_edge(contour, window, img_width, img_height):
+                    window = None
+            if window is None:
+                focus_img_x, contour, line = self.__find_line(image, frame.focus_line_y)
+
+        profiler.lap("track")
+        return Measurement(image, frame, focus_img_x, line, contour, centroids, window)
+
+    def __find_line(self, image, focus_line_y, window=None):
+        x0, y0 = 0, 0
+        if window is not None:
+            x0, y0, x1, y1 = window
+            image = image[y0:y1, x0:x1]
+
+        mask = self.__segmenter.mask(image)
+
+        # Only the rows around the focus line are searched
+        focus_img_x = self.__focus_band.get_centroid(mask, focus_line_y - y0)
+        if focus_img_x is not None:
+            focus_img_x += x0
+
+        contour = None
+        line = None
+        contours = self.__contour_finder.get_max_contours(mask, count=1, offset=(x0, y0))
+        if contours is not None and len(contours) == 1:
+            contour, area, img_x, img_y = get_moment(contours[0])
+            slope, degrees = utils.contour_slope_degrees(contour)
+            line = slope, degrees, img_x, img_y
+        return focus_img_x, contour, line
+
+    def process_image(self, image, capture_wall=0.0, capture_mono=0.0):
+        return self.report(self.measure(image, self.__profiler), capture_wall, capture_mono)
+
+    def report(self, measurement, capture_wall=0.0, capture_mono=0.0):
+        """
+        Publishes and draws a measured frame. Frames have to be reported in capture order.
+        """
+        image = measurement.image
+        img_height, img_width = image.shape[:2]
+
+        mid_x, mid_y, mid_inc, focus_line_y = measurement.frame
+        focus_line_inter = None
+        focus_img_x = measurement.focus_img_x
+        mid_line_inter = None
+        degrees = None
+        mid_line_cross = None
+
+        overlay = self.__overlay
+        overlay.clear()
+
+        line = measurement.line
+
+        for centroid in measurement.centroids:
+            overlay.circle(centroid, 4, GREEN, -1)
+
+        if self.__search_window:
+            self.__search_window.update(measurement.contour, measurement.window)
+            if measurement.window is not None:
+                x0, y0, x1, y1 = measurement.window
+                overlay.add(cv2.rectangle, (x0, y0), (x1 - 1, y1 - 1), YELLOW, 1)
+
+        if measurement.contour is not None:
+            # if self._display:
+            # (x, y, w, h) = cv2.boundingRect(contour)
+            # cv2.rectangle(frame, (x, y), (x + w, y + h), BLUE, 2)
+            overlay.contour(measurement.contour, GREEN, 2)
+            # cv2.circle(frame, (img_x, img_y), 4, RED, -1)
+
+        if line is not None:
+            slope, degrees, img_x, img_y = line
+
+            y_inter, focus_line_inter, mid_line_inter, mid_line_cross = line_geometry(slope, img_x, img_y,
+                                                                                      focus_line_y, mid_x, mid_y)
+
+            # Draw line for slope
+            if self.__display:
+                if slope is None:
+                    # Vertical
+                    overlay.line((img_x, 0), (img_x, img_height), BLUE, 2)
+                else:
+                    # Non vertical
+                    other_y = int((img_width * slope) + y_inter)
+                    overlay.line((0, y_inter), (img_width, other_y), BLUE, 2)
+
+        self.__profiler.lap("geometry")
+
+        if self.__position_filter:
+            self.__publish_filtered(focus_img_x, degrees, mid_line_cross, img_width, mid_x, mid_inc,
+                                    capture_wall, capture_mono)
+        # Write position if it is different from previous value written
+        elif focus_img_x != self.__prev_focus_img_x or (
+                self.__report_midline and mid_line_cross != self.__prev_mid_line_cross):
+            self.__position_server.write_position(*position_fields(focus_img_x, degrees, mid_line_cross,
+                                                                   img_width, mid_x, mid_inc),
+                                                  capture_wall=capture_wall,
+                                                  capture_mono=capture_mono,
+                                                  processed_mono=time.monotonic())
+            self.__prev_focus_img_x = focus_img_x
+            self.__prev_mid_line_cross = mid_line_cross
+        self.__profiler.lap("publish")
+
+        focus_in_middle = mid_x - mid_inc <= focus_img_x <= mid_x + mid_inc if focus_img_x is not None else False
+        focus_x_missing = focus_img_x is None
+        x_color = GREEN if focus_in_middle else RED if focus_x_missing else BLUE
+
+        # Set Blinkt leds
+        self.set_leds(x_color)
+        self.__profiler.lap("leds")
+
+        # Draw focus line
+        overlay.line((0, focus_line_y), (img_width, focus_line_y), GREEN, 2)
+
+        # Draw point where intersects focus line
+        if focus_line_inter is not None:
+            overlay.circle((focus_line_inter, focus_line_y), 6, RED, -1)
+
+        # Draw center of focus image
+        if focus_img_x is not None:
+            overlay.circle((focus_img_x, focus_line_y + 10), 6, YELLOW, -1)
+
+        # Draw point of midline insection
+        if mid_line_inter is not None and mid_line_inter <= focus_line_y:
+            overlay.circle((mid_x, mid_line_inter), 6, RED, -1)
+
+        overlay.line((mid_x - mid_inc, 0), (mid_x - mid_inc, img_height), x_color, 1)
+        overlay.line((mid_x + mid_inc, 0), (mid_x + mid_inc, img_height), x_color, 1)
+        overlay.add(draw_status, self.__cnt, img_width, img_height, self.__percent, line is not None, focus_img_x,
+                    mid_x, degrees, mid_line_cross)
+
+        # The overlay is only rasterized when the display or the HTTP server is going to use the image
+        now = time.time()
+        http_due = self.__image_server.enabled and now - self.__last_http_secs >= self.__http_delay_secs
+        if self.__display or http_due:
+            overlay.render(image)
+        self.__profiler.lap("overlay")
+
+        if http_due:
+            # The HTTP server keeps the image, and a reused buffer would be overwritten by the next frame
+            self.__image_server.image = image.copy() if self.__frame_pool is None else image
+            self.__last_http_secs = now
+        self.__profiler.lap("image_server")
+
+        return image
+
+    def __publish_filtered(self, focus_img_x, degrees, mid_line_cross, img_width, mid_x, mid_inc, capture_wall,
+                           capture_mono):
+        in_focus, mid_offset, _, mid_line_cross, width, middle_inc = position_fields(focus_img_x, degrees,
+                                                                                     mid_line_cross, img_width,
+                                                                                     mid_x, mid_inc)
+        processed_mono = time.monotonic()
+        # Predict to the publish time, falling back to now for callers without capture timestamps
+        in_focus, mid_offset, degrees = self.__position_filter.update(in_focus,
+                                                                      mid_offset,
+                                                                      degrees,
+                                                                      capture_mono if capture_mono else processed_mono,
+                                                                      processed_mono)
+        filtered = (in_focus, mid_offset, degrees, mid_line_cross if self.__report_midline else None)
+        if filtered != self.__prev_filtered:
+            self.__position_server.write_position(in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc,
+                                                  capture_wall=capture_wall,
+                                                  capture_mono=capture_mono,
+                                                  processed_mono=processed_mono)
+            self.__prev_filtered = filtered
 
     # Do not run this in a background thread. cv2.waitKey has to run in main thread
     def start(self):
@@ -116,170 +418,43 @@ class LineFollower(object):
 
         self.__image_server.start()
 
+        if self.__grabber:
+            self.__grabber.start()
+
         while self.__cam.is_open() and not self.__stopped:
             try:
-                image = self.__cam.read()
-                image = imutils.resize(image, width=self.__width)
-
-                if self.__flip_x:
-                    image = cv2.flip(image, 0)
-
-                if self.__flip_y:
-                    image = cv2.flip(image, 1)
-
-                img_height, img_width = image.shape[:2]
-
-                middle_pct = (self.__percent / 100.0) / 2
-                mid_x = img_width / 2
-                mid_y = img_height / 2
-                mid_inc = int(mid_x * middle_pct)
-                focus_line_inter = None
-                focus_img_x = None
-                mid_line_inter = None
-                degrees = None
-                mid_line_cross = None
-
-                focus_line_y = int(img_height - (img_height * (self.__focus_line_pct / 100.0)))
-
-                focus_mask = np.zeros(image.shape[:2], dtype="uint8")
-                cv2.rectangle(focus_mask, (0, focus_line_y - 5), (img_width, focus_line_y + 5), 255, -1)
-                focus_image = cv2.bitwise_and(image, image, mask=focus_mask)
-
-                focus_contours = self.__contour_finder.get_max_contours(focus_image, count=1)
-                if focus_contours is not None and len(focus_contours) == 1:
-                    max_focus_contour, focus_area, focus_img_x, focus_img_y = get_moment(focus_contours[0])
-
-                text = "#{0} ({1}, {2}) {0}%".format(self.__cnt, img_width, img_height, self.__percent)
-
-                contours = self.__contour_finder.get_max_contours(image, count=1)
-                if contours is not None and len(contours) == 1:
-                    contour, area, img_x, img_y = get_moment(contours[0])
-
-                    # if self._display:
-                    # (x, y, w, h) = cv2.boundingRect(contour)
-                    # cv2.rectangle(frame, (x, y), (x + w, y + h), BLUE, 2)
-                    cv2.drawContours(image, [contour], -1, GREEN, 2)
-                    # cv2.circle(frame, (img_x, img_y), 4, RED, -1)
-
-                    slope, degrees = utils.contour_slope_degrees(contour)
-
-                    # Draw line for slope
-                    if slope is None:
-                        # Vertical
-                        y_inter = None
-                        if self.__display:
-                            cv2.line(image, (img_x, 0), (img_x, img_height), BLUE, 2)
-                    else:
-                        # Non vertical
-                        y_inter = int(img_y - (slope * img_x))
-                        other_y = int((img_width * slope) + y_inter)
-                        if self.__display:
-                            cv2.line(image, (0, y_inter), (img_width, other_y), BLUE, 2)
-
-                    if focus_img_x is not None:
-                        text += " Pos: {0}".format(focus_img_x - mid_x)
-
-                    text += " Angle: {0}".format(degrees)
-
-                    # Calculate point where line intersects focus line
-                    if slope != 0:
-                        focus_line_inter = int((focus_line_y - y_inter) / slope) if y_inter is not None else img_x
-
-                    # Calculate point where line intersects x midpoint
-                    if slope is None:
-                        # Vertical line
-                        if focus_line_inter == mid_x:
-                            mid_line_inter = mid_y
-                    else:
-                        # Non-vertical line
-                        mid_line_inter = int((slope * mid_x) + y_inter)
-
-                    if mid_line_inter is not None:
-                        mid_line_cross = focus_line_y - mid_line_inter
-                        mid_line_cross = mid_line_cross if mid_line_cross > 0 else -1
-                        if mid_line_cross != -1:
-                            text += " Mid cross: {0}".format(mid_line_cross)
-
-                            # vx, vy, x, y = cv2.fitLine(contour, cv2.DIST_L2, 0, 0.01, 0.01)
-                            # lefty = int((-x * vy / vx) + y)
-                            # righty = int(((img_width - x) * vy / vx) + y)
-                            # cv2.line(image, (0, lefty), (img_width - 1, righty), GREEN, 2)
-                            # Flip this to reverse polarity
-                            # delta_y = float(lefty - righty)
-                            # delta_x = float(img_width - 1)
-                            # slope = round(delta_y / delta_x, 1)
-                            # radians = math.atan(slope)
-                            # degrees = round(math.degrees(radians), 1)
-                            # text += " {0} degrees".format(degrees)
-
-                # Write position if it is different from previous value written
-                if focus_img_x != self.__prev_focus_img_x or (
-                        self.__report_midline and mid_line_cross != self.__prev_mid_line_cross):
-                    self.__position_server.write_position(focus_img_x is not None,
-                                                          focus_img_x - mid_x if focus_img_x is not None else 0,
-                                                          degrees,
-                                                          mid_line_cross if mid_line_cross is not None else -1,
-                                                          img_width,
-                                                          mid_inc)
-                    self.__prev_focus_img_x = focus_img_x
-                    self.__prev_mid_line_cross = mid_line_cross
-
-                focus_in_middle = mid_x - mid_inc <= focus_img_x <= mid_x + mid_inc if focus_img_x is not None else False
-                focus_x_missing = focus_img_x is None
-                x_color = GREEN if focus_in_middle else RED if focus_x_missing else BLUE
-
-                # Set Blinkt leds
-                self.set_leds(x_color)
-
-                if self.__display or self.__image_server.enabled:
-                    # Draw focus line
-                    cv2.line(image, (0, focus_line_y), (img_width, focus_line_y), GREEN, 2)
-
-                    # Draw point where intersects focus line
-                    if focus_line_inter is not None:
-                        cv2.circle(image, (focus_line_inter, focus_line_y), 6, RED, -1)
-
-                    # Draw center of focus image
-                    if focus_img_x is not None:
-                        cv2.circle(image, (focus_img_x, focus_line_y + 10), 6, YELLOW, -1)
-
-                    # Draw point of midline insection
-                    if mid_line_inter is not None and mid_line_inter <= focus_line_y:
-                        cv2.circle(image, (mid_x, mid_line_inter), 6, RED, -1)
-
-                    cv2.line(image, (mid_x - mid_inc, 0), (mid_x - mid_inc, img_height), x_color, 1)
-                    cv2.line(image, (mid_x + mid_inc, 0), (mid_x + mid_inc, img_height), x_color, 1)
-                    cv2.putText(image, text, defs.TEXT_LOC, defs.TEXT_FONT, defs.TEXT_SIZE, RED, 1)
-
-                self.__image_server.image = image
-
-                if self.__display:
-                    cv2.imshow("Image", image)
-
-                    key = cv2.waitKey(30) & 0xFF
-
-                    if key == 255:
-                        pass
-                    elif key == ord("w"):
-                        self.width -= 10
-                    elif key == ord("W"):
-                        self.width += 10
-                    elif key == ord("-") or key == ord("_"):
-                        self.percent -= 1
-                    elif key == ord("+") or key == ord("="):
-                        self.percent += 1
-                    elif key == 1 or key == ord("j"):
-                        self.focus_line_pct -= 1
-                    elif key == 0 or key == ord("k"):
-                        self.focus_line_pct += 1
-                    elif key == ord("r"):
-                        self.width = self.__orig_width
-                        self.percent = self.__orig_percent
-                    elif key == ord("s"):
-                        utils.write_image(image, log_info=True)
-                    elif key == ord("q"):
-                        self.stop()
-
+                self.__profiler.start_frame()
+
+                if self.__grabber:
+                    captured = self.__grabber.read(timeout=1.0)
+                    if captured is None:
+                        continue
+                    image, capture_wall, capture_mono = captured
+                else:
+                    image = self.__cam.read()
+                    capture_wall, capture_mono = time.time(), time.monotonic()
+                self.__profiler.lap("capture")
+
+                if self.__capture_width != self.__width:
+                    # Frames captured at the old width are still resized by measure()
+                    self.__scaler.configure_camera(self.__cam, self.__width, image.shape)
+                    self.__capture_width = self.__width
+
+                if self.__frame_pool:
+                    released = self.__frame_pool.submit(image, capture_wall, capture_mono)
+                    self.__profiler.lap("pool")
+                    for frame_id, (measurement, capture_wall, capture_mono, measure_secs) in released:
+                        report_start = time.monotonic()
+                        image = self.report(measurement, capture_wall, capture_mono)
+                        # Frames are measured in parallel but reported one at a time in this thread
+                        self.__show(image, measure_secs / self.__workers + time.monotonic() - report_start)
+                else:
+                    process_start = time.monotonic()
+                    image = self.process_image(image, capture_wall, capture_mono)
+                    self.__show(image, time.monotonic() - process_start)
+
+                self.__profiler.end_frame()
+                self.__buffers.maybe_log_stats()
                 self.__cnt += 1
 
             except KeyboardInterrupt as e:
@@ -288,9 +463,60 @@ class LineFollower(object):
                 logger.error("Unexpected error in main loop [%s]", e, exc_info=True)
                 time.sleep(1)
 
+        if self.__frame_pool:
+            for frame_id, (measurement, capture_wall, capture_mono, measure_secs) in self.__frame_pool.drain():
+                self.report(measurement, capture_wall, capture_mono)
+
         self.clear_leds()
+        self.__buffers.log_stats()
+        if self.__frame_pool:
+            self.__frame_pool.shutdown()
+            self.__frame_pool.log_stats()
+        if self.__grabber:
+            self.__grabber.stop()
+            self.__grabber.log_stats()
         self.__cam.close()
 
+    def __measure_frame(self, image, capture_wall, capture_mono):
+        # Runs in a frame pool thread, which does not share the loop's profiler
+        start = time.monotonic()
+        measurement = self.measure(image, self.__null_profiler)
+        return measurement, capture_wall, capture_mono, time.monotonic() - start
+
+    def __show(self, image, process_secs):
+        if self.__resolution_controller:
+            width = self.__resolution_controller.update(process_secs)
+            if width:
+                self.width = width
+
+        if self.__display:
+            cv2.imshow("Image", image)
+
+            key = cv2.waitKey(30) & 0xFF
+
+            if key == 255:
+                pass
+            elif key == ord("w"):
+                self.width -= 10
+            elif key == ord("W"):
+                self.width += 10
+            elif key == ord("-") or key == ord("_"):
+                self.percent -= 1
+            elif key == ord("+") or key == ord("="):
+                self.percent += 1
+            elif key == 1 or key == ord("j"):
+                self.focus_line_pct -= 1
+            elif key == 0 or key == ord("k"):
+                self.focus_line_pct += 1
+            elif key == ord("r"):
+                self.width = self.__orig_width
+                self.percent = self.__orig_percent
+            elif key == ord("s"):
+                utils.write_image(image, log_info=True)
+            elif key == ord("q"):
+                self.stop()
+            self.__profiler.lap("display")
+
     def stop(self):
         self.__stopped = True
         self.__position_server.stop()
@@ -314,6 +540,14 @@ def main():
     cli.width(parser)
     parser.add_argument("-f", "--focus", default=10, type=int, dest="focus_line_pct",
                         help="Focus line % from bottom [10]")
+    parser.add_argument("--tracker", default=TRACKER_CONTOURS, choices=[TRACKER_CONTOURS, TRACKER_SCANLINES],
+                        help="Line tracker [{0}]".format(TRACKER_CONTOURS))
+    parser.add_argument("--scanlines", default=5, type=int, dest="scanline_count",
+                        help="Number of scanlines used by the scanlines tracker [5]")
+    parser.add_argument("--search-window", default=False, action="store_true", dest="search_window",
+                        help="Search near the last line position and only scan the full frame to reacquire [false]")
+    parser.add_argument("--window-margin", default=30, type=int, dest="window_margin",
+                        help="Search window margin in pixels [30]")
     parser.add_argument("-n", "--midline", default=False, action="store_true", dest="report_midline",
                         help="Report data when changes in midline [false]")
     cli.middle_percent(parser)
@@ -321,9 +555,34 @@ def main():
     cli.hsv_range(parser)
     cli.flip_x(parser),
     cli.flip_y(parser),
+    parser.add_argument("--resize", default=RESIZE_AREA, choices=RESIZE_MODES,
+                        help="Resize interpolation, linear is faster but aliases on large downscales [{0}]"
+                        .format(RESIZE_AREA))
     cli.camera_name_optional(parser),
     cli.display(parser)
+    parser.add_argument("--capture-thread", default=False, action="store_true", dest="capture_thread",
+                        help="Capture frames in a background thread [false]")
+    parser.add_argument("--workers", default=0, type=int,
+                        help="Threads measuring frames in parallel, 0 measures in the loop thread [0]")
+    parser.add_argument("--hsv-lut", default=False, action="store_true", dest="hsv_lut",
+                        help="Segment with a cached BGR lookup table instead of an HSV conversion [false]")
+    parser.add_argument("--target-fps", default=None, type=float, dest="target_fps",
+                        help="Adjust image width automatically to hold this frame rate")
+    parser.add_argument("--filter", default=None, choices=FILTERS, dest="smoothing",
+                        help="Smooth and predict positions with this filter")
+    parser.add_argument("--coast", default=0.2, type=float, dest="coast_secs",
+                        help="Secs the filter predicts through missed detections [0.2]")
+    parser.add_argument("--lead", default=0, type=int, dest="lead_ms",
+                        help="Msecs the filter predicts past the publish time [0]")
+    parser.add_argument("--profile", default=False, action="store_true",
+                        help="Record and report per-stage timings [false]")
     cli.grpc_port(parser)
+    parser.add_argument("--queue", default=10, type=int, dest="queue_size",
+                        help="Per-subscriber position queue size [10]")
+    parser.add_argument("--overflow", default=OVERFLOW_COALESCE, choices=OVERFLOW_POLICIES,
+                        help="Policy when a subscriber queue is full [{0}]".format(OVERFLOW_COALESCE))
+    parser.add_argument("--shm", default=False, action="store_true",
+                        help="Also publish positions in shared memory for same-host readers [false]")
     cli.leds(parser)
     cli.http_host(parser)
     cli.http_delay_secs(parser)
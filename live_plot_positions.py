@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import logging
+import time
+from threading import Lock
+from threading import Thread
+
+import arc852.cli_args  as cli
+import matplotlib.animation as animation
+import matplotlib.pyplot as plt
+import numpy as np
+from arc852.constants import LOG_LEVEL, GRPC_HOST
+from arc852.grpc_support import grpc_url
+from arc852.utils import setup_logging
+
+from latency import is_local_host
+from position_client import position_batches
+
+logger = logging.getLogger(__name__)
+
+
+class PositionRing(object):
+    """
+    Preallocated ring of (time, mid_offset) samples. Out of focus samples are stored as NaN so they show as
+    gaps in the plot. Samples are placed at their capture time, since batches arrive together. Monotonic
+    clocks are only comparable on the same host, so remote servers use wall clock times.
+    """
+
+    def __init__(self, size=10000, local=True):
+        self.__size = size
+        self.__local = local
+        self.__times = np.zeros(size, dtype=np.float64)
+        self.__values = np.full(size, np.nan, dtype=np.float64)
+        self.__next = 0
+        self.__count = 0
+        self.__lock = Lock()
+
+    @property
+    def count(self):
+        return self.__count
+
+    def now(self):
+        return time.monotonic() if self.__local else time.time()
+
+    def add_records(self, records):
+        with self.__lock:
+            for r in records:
+                # Values published before a capture time was set fall back to the receive time
+                if self.__local:
+                    self.__times[self.__next] = r.capture_mono if r.capture_mono else r.received_mono
+                else:
+                    self.__times[self.__next] = r.capture_wall if r.capture_wall else r.received_wall
+                self.__values[self.__next] = r.mid_offset if r.in_focus else np.nan
+                self.__next = (self.__next + 1) % self.__size
+            self.__count += len(records)
+
+    def snapshot(self, since):
+        """
+        Returns copies of the samples captured after since, on the clock of now(), oldest first.
+        """
+        with self.__lock:
+            if self.__count < self.__size:
+                times = self.__times[:self.__next]
+                values = self.__values[:self.__next]
+            else:
+                times = np.concatenate((self.__times[self.__next:], self.__times[:self.__next]))
+                values = np.concatenate((self.__values[self.__next:], self.__values[:self.__next]))
+            start = np.searchsorted(times, since)
+            return times[start:].copy(), values[start:].copy()
+
+
+def decimate(times, values, max_points):
+    """
+    Reduces samples to at most max_points by keeping the min and max of each bucket, so spikes stay visible.
+    """
+    if max_points < 2:
+        raise ValueError("max_points must be at least 2")
+    if len(times) <= max_points:
+        return times, values
+    buckets = max_points // 2
+    n = (len(times) // buckets) * buckets
+    # Drop the oldest samples that do not fill a bucket
+    times = times[-n:].reshape(buckets, -1)
+    values = values[-n:].reshape(buckets, -1)
+    dec_times = np.repeat(times[:, 0], 2)
+    dec_values = np.empty(2 * buckets, dtype=values.dtype)
+    dec_values[0::2] = np.fmin.reduce(values, axis=1)
+    dec_values[1::2] = np.fmax.reduce(values, axis=1)
+    return dec_times, dec_values
+
+
+def read_positions(hostname, ring, batch_size):
+    for batch in position_batches(hostname, max_batch_size=batch_size, max_latency_ms=20):
+        ring.add_records(batch)
+
+
+def main():
+    # Parse CLI args
+    parser = cli.argparse.ArgumentParser()
+    cli.grpc_host(parser)
+    parser.add_argument("--window", default=10.0, type=float, dest="window_secs",
+                        help="Secs of history plotted [10.0]")
+    parser.add_argument("--buffer", default=10000, type=int, dest="buffer_size",
+                        help="Positions kept in the ring buffer [10000]")
+    parser.add_argument("--max-points", default=2000, type=int, dest="max_points",
+                        help="Max points drawn per frame [2000]")
+    parser.add_argument("--ymax", default=400, type=int,
+                        help="Plotted mid offset range [400]")
+    cli.log_level(parser)
+    args = vars(parser.parse_args())
+    if args["max_points"] < 2:
+        parser.error("--max-points must be at least 2")
+
+    # Setup logging
+    setup_logging(level=args[LOG_LEVEL])
+
+    window_secs = args["window_secs"]
+    max_points = args["max_points"]
+    ring = PositionRing(args["buffer_size"], local=is_local_host(grpc_url(args[GRPC_HOST])))
+
+    fig, ax = plt.subplots()
+    ax.set_title("Line Offsets")
+    ax.set_xlabel("secs")
+    ax.set_xlim(-window_secs, 0)
+    ax.set_ylim(-args["ymax"], args["ymax"])
+    line, = ax.plot([], [], lw=1)
+    rate = ax.text(0.02, 0.95, "", transform=ax.transAxes)
+
+    state = {"count": 0, "secs": time.monotonic()}
+
+    def update(frame):
+        now = ring.now()
+        times, values = decimate(*ring.snapshot(now - window_secs), max_points=max_points)
+        line.set_data(times - now, values)
+        secs = time.monotonic()
+        if secs - state["secs"] >= 1.0:
+            rate.set_text("{0:.0f} positions/sec".format((ring.count - state["count"]) / (secs - state["secs"])))
+            state["count"], state["secs"] = ring.count, secs
+        return line, rate
+
+    # Only the batched RPC is opened, a PositionClient would also stream every position individually
+    Thread(target=read_positions, args=(args[GRPC_HOST], ring, 100), daemon=True).start()
+    # Only the line and rate artists are redrawn each frame
+    anim = animation.FuncAnimation(fig, update, interval=33, blit=True)
+    try:
+        plt.show()
+    except KeyboardInterrupt:
+        pass
+
+    logger.info("Exiting...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import cv2
+
+
+class Overlay(object):
+    """
+    Records drawing operations so they are only rasterized when someone consumes the image.
+    """
+
+    def __init__(self, enabled=True):
+        self.__enabled = enabled
+        self.__ops = []
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    def clear(self):
+        del self.__ops[:]
+
+    def add(self, func, *args):
+        if self.__enabled:
+            self.__ops.append((func, args))
+
+    def contour(self, contour, color, thickness):
+        if self.__enabled:
+            self.__ops.append((cv2.drawContours, ([contour], -1, color, thickness)))
+
+    def line(self, pt1, pt2, color, thickness):
+        if self.__enabled:
+            self.__ops.append((cv2.line, (pt1, pt2, color, thickness)))
+
+    def circle(self, center, radius, color, thickness):
+        if self.__enabled:
+            self.__ops.append((cv2.circle, (center, radius, color, thickness)))
+
+    def render(self, image):
+        for func, args in self.__ops:
+            func(image, *args)
+        self.clear()
+        return image
@@ -1,30 +1,96 @@
 from __future__ import print_function
 
-import copy
 import logging
 import socket
 import time
-from threading import Event
+from collections import namedtuple
+from threading import Condition
+from timeit import default_timer
 
 import grpc
 from arc852.grpc_support import GenericClient
 from arc852.grpc_support import TimeoutException
+from arc852.grpc_support import grpc_url
 from arc852.utils import setup_logging
 
+from latency import LatencyTracker
+from latency import is_local_host
+from proto.position_service_pb2 import BatchRequest
 from proto.position_service_pb2 import ClientInfo
-from proto.position_service_pb2 import PositionServiceStub
+from proto.position_service_pb2_grpc import PositionServiceStub
 
 logger = logging.getLogger(__name__)
 
+# seq counts messages received by this client, id is the server's position id
+PositionRecord = namedtuple("PositionRecord",
+                            "seq id in_focus mid_offset degrees mid_line_cross width middle_inc "
+                            "capture_wall capture_mono processed_mono published_mono received_wall received_mono "
+                            "source")
+
+
+def to_record(seq, val):
+    return PositionRecord(seq, val.id, val.in_focus, val.mid_offset, val.degrees, val.mid_line_cross, val.width,
+                          val.middle_inc, val.capture_wall, val.capture_mono, val.processed_mono, val.published_mono,
+                          time.time(), time.monotonic(), val.source)
+
+
+def position_batches(hostname, max_batch_size=100, max_latency_ms=100, pause_secs=2.0, stopped=None):
+    """
+    Generator of lists of PositionRecords, streamed on the batched RPC only. Every position is delivered unless
+    the consumer falls more than a few batches behind. Runs until stopped() returns True or it is closed.
+    """
+    hostname = grpc_url(hostname)
+    channel = grpc.insecure_channel(hostname)
+    stub = PositionServiceStub(channel)
+    request = BatchRequest(info="{0} batch client".format(socket.gethostname()),
+                           max_batch_size=max_batch_size,
+                           max_latency_ms=max_latency_ms)
+    seq = 0
+    try:
+        while not (stopped and stopped()):
+            try:
+                for batch in stub.getPositionBatches(request):
+                    records = []
+                    for val in batch.positions:
+                        seq += 1
+                        records.append(to_record(seq, val))
+                    yield records
+                    if stopped and stopped():
+                        break
+            except grpc.RpcError as e:
+                logger.info("Disconnected from gRPC server at %s [%s]", hostname, e)
+                time.sleep(pause_secs)
+    finally:
+        channel.close()
+
 
 class PositionClient(GenericClient):
-    def __init__(self, hostname):
+    def __init__(self, hostname, mid_offset_deadband=0, degrees_deadband=0, max_rate=0.0, fields=None, sources=None):
         super(PositionClient, self).__init__(hostname, desc="position client")
-        self.__ready = Event()
-        self.__currval = None
+        # Applied by the server to this client's getPositions stream
+        self.__client_info = ClientInfo(info="{0} client".format(socket.gethostname()),
+                                        mid_offset_deadband=mid_offset_deadband,
+                                        degrees_deadband=degrees_deadband,
+                                        max_rate=max_rate,
+                                        fields=fields,
+                                        sources=sources)
+        self.__cond = Condition()
+        self.__waiters = 0
+        self.__latest = None
+        self.__seq = 0
+        self.__read_seq = 0
+        self.__msg_cnt = 0
+        self.__msg_secs = 0.0
+        self.__latency = LatencyTracker(is_local_host(self.hostname))
+
+    @property
+    def latest(self):
+        # Non-blocking, the record is immutable and swapped with a single assignment
+        return self.__latest
 
     def _mark_ready(self):
-        self.__ready.set()
+        with self.__cond:
+            self.__cond.notify_all()
 
     def _get_values(self, pause_secs=2.0):
         channel = grpc.insecure_channel(self.hostname)
@@ -32,8 +98,7 @@ class PositionClient(GenericClient):
         while not self.stopped:
             logger.info("Connecting to gRPC server at %s...", self.hostname)
             try:
-                client_info = ClientInfo(info="{0} client".format(socket.gethostname()))
-                server_info = stub.registerClient(client_info)
+                server_info = stub.registerClient(self.__client_info)
             except BaseException as e:
                 logger.error("Failed to connect to gRPC server at %s [%s]", self.hostname, e)
                 time.sleep(pause_secs)
@@ -41,34 +106,89 @@ class PositionClient(GenericClient):
 
             logger.info("Connected to gRPC server at %s [%s]", self.hostname, server_info.info)
             try:
-                for val in stub.getPositions(client_info):
-                    with self.value_lock:
-                        self.__currval = copy.deepcopy(val)
-                    self._mark_ready()
+                for val in stub.getPositions(self.__client_info):
+                    start = default_timer()
+                    self.__seq += 1
+                    self.__latest = to_record(self.__seq, val)
+                    self.__latency.add(self.__latest)
+                    # Only pay for the lock when someone is blocked waiting
+                    if self.__waiters:
+                        self._mark_ready()
+                    self.__msg_cnt += 1
+                    self.__msg_secs += default_timer() - start
             except BaseException as e:
                 logger.info("Disconnected from gRPC server at %s [%s]", self.hostname, e)
                 time.sleep(pause_secs)
 
+    # Blocking
+    def wait_for(self, seq, timeout=None):
+        """
+        Returns the latest record once its seq is greater than seq. Raises TimeoutException after timeout
+        secs and returns None if the client is stopped.
+        """
+        val = self.__latest
+        if val is not None and val.seq > seq:
+            return val
+
+        end = None if timeout is None else time.time() + timeout
+        with self.__cond:
+            self.__waiters += 1
+            try:
+                while not self.stopped:
+                    val = self.__latest
+                    if val is not None and val.seq > seq:
+                        return val
+                    remaining = None if end is None else end - time.time()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutException
+                    self.__cond.wait(remaining)
+            finally:
+                self.__waiters -= 1
+        return None
+
     # Blocking
     def get_position(self, timeout=None):
-        while not self.stopped:
-            if not self.__ready.wait(timeout):
-                raise TimeoutException
-            with self.value_lock:
-                if self.__ready.is_set() and not self.stopped:
-                    self.__ready.clear()
-                    return self.__currval
+        val = self.wait_for(self.__read_seq, timeout)
+        if val is not None:
+            self.__read_seq = val.seq
+        return val
 
     def get_positions(self):
         while not self.stopped:
             yield self.get_position()
 
+    def get_position_batches(self, max_batch_size=100, max_latency_ms=100, pause_secs=2.0):
+        """
+        position_batches() on a separate batched RPC, until this client is stopped. Readers that only want
+        batches should call position_batches() directly, so no getPositions stream is opened.
+        """
+        return position_batches(self.hostname, max_batch_size, max_latency_ms, pause_secs,
+                                stopped=lambda: self.stopped)
+
+    def latency_report(self):
+        """
+        Returns [(stage, count, p50_ms, p95_ms, p99_ms), ...] for capture -> receive latency and its parts.
+        """
+        return self.__latency.report()
+
+    def log_latency_report(self):
+        self.__latency.log_report()
+
+    def stats(self):
+        """
+        Returns (messages received, mean client-side handling usecs per message).
+        """
+        cnt = self.__msg_cnt
+        return cnt, (self.__msg_secs / cnt) * 1e6 if cnt else 0.0
+
 
 def main():
     setup_logging()
     with PositionClient("localhost") as client:
         for i in range(1000):
             logger.info("Read value:\n%s", client.get_position())
+        logger.info("Received %d messages, %.1f usecs per message", *client.stats())
+        client.log_latency_report()
     logger.info("Exiting...")
 
 
@@ -0,0 +1,146 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+FILTER_ALPHA_BETA = "alpha-beta"
+FILTER_KALMAN = "kalman"
+FILTERS = [FILTER_ALPHA_BETA, FILTER_KALMAN]
+
+
+class AlphaBetaTracker(object):
+    """
+    Constant velocity alpha-beta filter for a single value.
+    """
+
+    def __init__(self, alpha=0.5, beta=0.1):
+        self.__alpha = alpha
+        self.__beta = beta
+        self.reset()
+
+    @property
+    def initialized(self):
+        return self.__secs is not None
+
+    def reset(self):
+        self.__x = 0.0
+        self.__v = 0.0
+        self.__secs = None
+
+    def update(self, secs, z):
+        if self.__secs is None:
+            self.__x, self.__v, self.__secs = float(z), 0.0, secs
+            return
+        dt = secs - self.__secs
+        if dt <= 0:
+            self.__x += self.__alpha * (z - self.__x)
+            return
+        x = self.__x + self.__v * dt
+        r = z - x
+        self.__x = x + self.__alpha * r
+        self.__v += (self.__beta / dt) * r
+        self.__secs = secs
+
+    def predict(self, secs):
+        return self.__x + self.__v * max(secs - self.__secs, 0.0)
+
+
+class KalmanTracker(object):
+    """
+    Constant velocity Kalman filter for a single value. process_noise is the acceleration noise spectral
+    density (units^2 / sec^3) and measurement_noise the measurement variance (units^2).
+    """
+
+    def __init__(self, process_noise=500.0, measurement_noise=4.0):
+        self.__q = process_noise
+        self.__r = measurement_noise
+        self.reset()
+
+    @property
+    def initialized(self):
+        return self.__secs is not None
+
+    def reset(self):
+        self.__x = 0.0
+        self.__v = 0.0
+        self.__p = None
+        self.__secs = None
+
+    def update(self, secs, z):
+        if self.__secs is None:
+            self.__x, self.__v, self.__secs = float(z), 0.0, secs
+            # Unknown velocity starts with a large variance
+            self.__p = [self.__r, 0.0, 0.0, 1e4]
+            return
+
+        # Predict
+        dt = max(secs - self.__secs, 0.0)
+        p00, p01, p10, p11 = self.__p
+        q = self.__q
+        x = self.__x + self.__v * dt
+        p00 += dt * (p10 + p01) + dt * dt * p11 + q * dt ** 3 / 3
+        p01 += dt * p11 + q * dt ** 2 / 2
+        p10 += dt * p11 + q * dt ** 2 / 2
+        p11 += q * dt
+
+        # Update
+        s = p00 + self.__r
+        k0 = p00 / s
+        k1 = p10 / s
+        r = z - x
+        self.__x = x + k0 * r
+        self.__v += k1 * r
+        self.__p = [(1 - k0) * p00, (1 - k0) * p01, p10 - k1 * p00, p11 - k1 * p01]
+        self.__secs = secs
+
+    def predict(self, secs):
+        return self.__x + self.__v * max(secs - self.__secs, 0.0)
+
+
+class PositionFilter(object):
+    """
+    Smooths mid_offset and degrees, coasts through missed detections for up to coast_secs and predicts
+    both forward from the capture time to the publish time plus lead_secs.
+    """
+
+    def __init__(self, kind=FILTER_ALPHA_BETA, coast_secs=0.2, lead_secs=0.0, **kwargs):
+        if kind not in FILTERS:
+            raise ValueError("Invalid filter: {0}".format(kind))
+        tracker = AlphaBetaTracker if kind == FILTER_ALPHA_BETA else KalmanTracker
+        self.__offset = tracker(**kwargs)
+        self.__degrees = tracker(**kwargs)
+        self.__coast_secs = coast_secs
+        self.__lead_secs = lead_secs
+        self.__last_secs = None
+        self.__degrees_secs = None
+        self.coasted = 0
+
+    def reset(self):
+        self.__offset.reset()
+        self.__degrees.reset()
+        self.__last_secs = None
+        self.__degrees_secs = None
+
+    def update(self, in_focus, mid_offset, degrees, capture_secs, publish_secs):
+        """
+        degrees is None when no line was found. Returns the (in_focus, mid_offset, degrees) to publish.
+        """
+        if in_focus:
+            self.__offset.update(capture_secs, mid_offset)
+            self.__last_secs = capture_secs
+        elif self.__last_secs is None or capture_secs - self.__last_secs > self.__coast_secs:
+            self.reset()
+            return False, 0, degrees
+        else:
+            self.coasted += 1
+
+        if degrees is not None:
+            self.__degrees.update(capture_secs, degrees)
+            self.__degrees_secs = capture_secs
+        elif self.__degrees_secs is not None and capture_secs - self.__degrees_secs > self.__coast_secs:
+            self.__degrees.reset()
+            self.__degrees_secs = None
+
+        secs = publish_secs + self.__lead_secs
+        return (True,
+                int(round(self.__offset.predict(secs))),
+                int(round(self.__degrees.predict(secs))) if self.__degrees.initialized else degrees)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+import glob
+import logging
+import os
+import struct
+import time
+
+import arc852.cli_args  as cli
+import numpy as np
+from arc852.constants import LOG_LEVEL, GRPC_HOST
+from arc852.utils import setup_logging
+
+from position_client import position_batches
+
+logger = logging.getLogger(__name__)
+
+# PositionRecord without the client-local seq, packed so records are fixed width
+POSITION_DTYPE = np.dtype([("id", "<i4"),
+                           ("in_focus", "u1"),
+                           ("mid_offset", "<i4"),
+                           ("degrees", "<i4"),
+                           ("mid_line_cross", "<i4"),
+                           ("width", "<i4"),
+                           ("middle_inc", "<i4"),
+                           ("capture_wall", "<f8"),
+                           ("capture_mono", "<f8"),
+                           ("processed_mono", "<f8"),
+                           ("published_mono", "<f8"),
+                           ("received_wall", "<f8"),
+                           ("received_mono", "<f8"),
+                           ("source", "<i4")])
+
+MAGIC = b"LFPOSLOG"
+VERSION = 2
+HEADER = struct.Struct("<8sII")
+
+
+class PositionLogWriter(object):
+    """
+    Appends positions to fixed-width binary logs in a directory, starting a new file once the current one
+    holds max_records.
+    """
+
+    def __init__(self, directory, max_records=1000000, prefix="positions"):
+        self.__directory = directory
+        self.__max_records = max_records
+        self.__prefix = prefix
+        self.__file = None
+        self.__path = None
+        self.__records = 0
+        self.__file_cnt = 0
+        self.total = 0
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @property
+    def path(self):
+        return self.__path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return self
+
+    def __rotate(self):
+        self.close()
+        self.__file_cnt += 1
+        self.__path = os.path.join(self.__directory,
+                                   "{0}-{1}-{2:04d}.bin".format(self.__prefix,
+                                                                time.strftime("%Y%m%d-%H%M%S"),
+                                                                self.__file_cnt))
+        self.__file = open(self.__path, "wb")
+        self.__file.write(HEADER.pack(MAGIC, VERSION, POSITION_DTYPE.itemsize))
+        self.__records = 0
+        logger.info("Writing positions to %s", self.__path)
+
+    def write(self, records):
+        """
+        Appends a list of PositionRecords.
+        """
+        start = 0
+        while start < len(records):
+            if self.__file is None or self.__records >= self.__max_records:
+                self.__rotate()
+            chunk = records[start:start + self.__max_records - self.__records]
+            arr = np.array([tuple(r[1:]) for r in chunk], dtype=POSITION_DTYPE)
+            self.__file.write(arr.tobytes())
+            self.__records += len(chunk)
+            self.total += len(chunk)
+            start += len(chunk)
+        if self.__file is not None:
+            self.__file.flush()
+
+    def close(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+
+def read_position_log(path):
+    """
+    Memory-maps a log written by PositionLogWriter as a NumPy record array. A partial record at the end,
+    left by a recorder that was killed mid-write, is ignored.
+    """
+    with open(path, "rb") as f:
+        magic, version, itemsize = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or itemsize != POSITION_DTYPE.itemsize:
+        raise ValueError("Not a version {0} position log: {1}".format(VERSION, path))
+    cnt = (os.path.getsize(path) - HEADER.size) // itemsize
+    if cnt == 0:
+        return np.recarray((0,), dtype=POSITION_DTYPE)
+    return np.memmap(path, dtype=POSITION_DTYPE, mode="r", offset=HEADER.size, shape=(cnt,)).view(np.recarray)
+
+
+def position_logs(directory, prefix="positions"):
+    """
+    Returns the log files in a directory in the order they were written.
+    """
+    return sorted(glob.glob(os.path.join(directory, "{0}-*.bin".format(prefix))))
+
+
+def main():
+    # Parse CLI args
+    parser = cli.argparse.ArgumentParser()
+    cli.grpc_host(parser)
+    parser.add_argument("-d", "--dir", default="position_logs", type=str, dest="directory",
+                        help="Log directory [position_logs]")
+    parser.add_argument("--max-records", default=1000000, type=int, dest="max_records",
+                        help="Records per log file before rotating [1000000]")
+    parser.add_argument("--batch", default=100, type=int, dest="batch_size",
+                        help="Max positions per batch [100]")
+    cli.log_level(parser)
+    args = vars(parser.parse_args())
+
+    # Setup logging
+    setup_logging(level=args[LOG_LEVEL])
+
+    # Only the batched RPC is opened, a PositionClient would also stream every position individually
+    with PositionLogWriter(args["directory"], max_records=args["max_records"]) as writer:
+        try:
+            for batch in position_batches(args[GRPC_HOST], max_batch_size=args["batch_size"]):
+                writer.write(batch)
+        except KeyboardInterrupt:
+            pass
+        logger.info("Recorded %d positions", writer.total)
+
+    logger.info("Exiting...")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,162 @@
+import asyncio
 import logging
 import time
 
 import grpc
 from arc852.grpc_support import GenericServer
 from arc852.utils import setup_logging
-from concurrent import futures
 
+from fanout import Broadcaster
+from fanout import OVERFLOW_COALESCE
+from fanout import OVERFLOW_DROP_OLDEST
 from proto.position_service_pb2 import Position
-from proto.position_service_pb2 import PositionServiceServicer
+from proto.position_service_pb2 import PositionBatch
+from proto.position_service_pb2 import Profile
 from proto.position_service_pb2 import ServerInfo
-from proto.position_service_pb2 import add_PositionServiceServicer_to_server
+from proto.position_service_pb2 import ServerStats
+from proto.position_service_pb2 import StageTiming
+from proto.position_service_pb2 import SubscriberStats
+from proto.position_service_pb2_grpc import PositionServiceServicer
+from proto.position_service_pb2_grpc import add_PositionServiceServicer_to_server
+from shm_positions import ShmPositionWriter
+from shm_positions import shm_path
+from subscription import subscription_filter
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_LATENCY_MS = 100
+
 
 class PositionServer(PositionServiceServicer, GenericServer):
-    def __init__(self, port=None):
+    def __init__(self, port=None, profiler=None, queue_size=10, overflow=OVERFLOW_COALESCE, shm=False):
         super(PositionServer, self).__init__(port=port, desc="position server")
         self.grpc_server = None
+        self.__profiler = profiler
+        # Same-host readers can skip gRPC and read the latest position from shared memory. Each source gets its
+        # own record on its first position.
+        self.__port = port
+        self.__shm = shm
+        self.__shm_writers = {}
+        # Streams are served from one asyncio loop, so subscriber count is not tied to a thread pool
+        self.__broadcaster = Broadcaster(queue_size, overflow)
 
-    def registerClient(self, request, context):
+    async def registerClient(self, request, context):
         logger.info("Connected to %s client %s [%s]", self.desc, context.peer(), request.info)
         return ServerInfo(info="Server invoke count {0}".format(self.increment_cnt()))
 
-    def getPositions(self, request, context):
-        client_info = request.info
-        return self.currval_generator(context.peer())
+    async def getPositions(self, request, context):
+        try:
+            options = subscription_filter(request)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        subscriber = self.__broadcaster.subscribe(context.peer(), request.info, options=options)
+        try:
+            async for val in subscriber:
+                yield val
+        finally:
+            self.__broadcaster.unsubscribe(subscriber)
+
+    async def getPositionBatches(self, request, context):
+        max_size = request.max_batch_size if request.max_batch_size > 0 else DEFAULT_BATCH_SIZE
+        max_latency_ms = request.max_latency_ms if request.max_latency_ms > 0 else DEFAULT_BATCH_LATENCY_MS
+        # Batch consumers want every sample, so they queue a few batches instead of coalescing
+        subscriber = self.__broadcaster.subscribe(context.peer(),
+                                                  request.info,
+                                                  queue_size=4 * max_size,
+                                                  overflow=OVERFLOW_DROP_OLDEST)
+        try:
+            while True:
+                batch = await subscriber.get_batch(max_size, max_latency_ms / 1000.0)
+                if batch is None:
+                    break
+                yield PositionBatch(positions=batch)
+        finally:
+            self.__broadcaster.unsubscribe(subscriber)
+
+    async def getProfile(self, request, context):
+        if self.__profiler is None or not self.__profiler.enabled:
+            return Profile(enabled=False)
+        fps, stages = self.__profiler.report()
+        return Profile(enabled=True,
+                       fps=fps,
+                       stages=[StageTiming(name=name, count=count, p50_ms=p50, p95_ms=p95, p99_ms=p99)
+                               for name, count, p50, p95, p99 in stages])
+
+    async def getSubscriberStats(self, request, context):
+        latest = self.__broadcaster.latest
+        latest_id = latest.id if latest is not None else -1
+        return ServerStats(published=self.__broadcaster.published,
+                           subscribers=[SubscriberStats(peer=s.peer,
+                                                        info=s.info,
+                                                        sent=s.sent,
+                                                        dropped=s.dropped,
+                                                        queued=s.queued,
+                                                        lag=max(latest_id - s.last_id, 0),
+                                                        filtered=s.filtered)
+                                        for s in self.__broadcaster.subscribers])
+
+    def stop(self):
+        super(PositionServer, self).stop()
+        # Removes the record, so same-host clients fall back to gRPC instead of reading stale positions
+        for writer in list(self.__shm_writers.values()):
+            writer.close()
 
     def _init_values_on_start(self):
         self.write_position(False, -1, -1, -1, -1, -1)
 
     def _start_server(self):
         logger.info("Starting gRPC %s listening on %s", self.desc, self.hostname)
-        self.grpc_server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-        add_PositionServiceServicer_to_server(self, self.grpc_server)
-        self.grpc_server.add_insecure_port(self.hostname)
-        self.grpc_server.start()
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
         try:
-            while not self.stopped:
-                time.sleep(1)
+            loop.run_until_complete(self.__serve(loop))
         except KeyboardInterrupt:
             pass
         finally:
             self.stop()
+            loop.close()
+
+    async def __serve(self, loop):
+        self.grpc_server = grpc.aio.server()
+        add_PositionServiceServicer_to_server(self, self.grpc_server)
+        self.grpc_server.add_insecure_port(self.hostname)
+        await self.grpc_server.start()
+        self.__broadcaster.bind(loop)
+        try:
+            while not self.stopped:
+                await asyncio.sleep(0.5)
+        finally:
+            self.__broadcaster.bind(None)
+            self.__broadcaster.close()
+            await self.grpc_server.stop(1.0)
 
-    def write_position(self, in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc):
+    def write_position(self, in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc,
+                       capture_wall=0.0, capture_mono=0.0, processed_mono=0.0, source=0):
         if not self.stopped:
-            self.set_currval(Position(id=self.id,
-                                      in_focus=in_focus,
-                                      mid_offset=mid_offset,
-                                      degrees=degrees,
-                                      mid_line_cross=mid_line_cross,
-                                      width=width,
-                                      middle_inc=middle_inc))
+            # Optional fields are None when no line is found, use the values clients already see for them
+            mid_offset = 0 if mid_offset is None else mid_offset
+            degrees = 0 if degrees is None else degrees
+            mid_line_cross = -1 if mid_line_cross is None else mid_line_cross
+            published_mono = time.monotonic()
+            if self.__shm:
+                writer = self.__shm_writers.get(source)
+                if writer is None:
+                    writer = self.__shm_writers[source] = ShmPositionWriter(shm_path(self.__port, source))
+                writer.write(self.id, in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc,
+                             capture_wall, capture_mono, processed_mono, published_mono, source)
+            self.__broadcaster.publish(Position(id=self.id,
+                                                in_focus=in_focus,
+                                                mid_offset=mid_offset,
+                                                degrees=degrees,
+                                                mid_line_cross=mid_line_cross,
+                                                width=width,
+                                                middle_inc=middle_inc,
+                                                capture_wall=capture_wall,
+                                                capture_mono=capture_mono,
+                                                processed_mono=processed_mono,
+                                                published_mono=published_mono,
+                                                source=source))
             self.id += 1
 
 
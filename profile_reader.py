@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import logging
+import socket
+import time
+
+import arc852.cli_args  as cli
+import grpc
+from arc852.cli_args import setup_cli_args
+from arc852.constants import LOG_LEVEL, GRPC_HOST
+from arc852.grpc_support import grpc_url
+from arc852.utils import setup_logging
+
+from proto.position_service_pb2 import ClientInfo
+from proto.position_service_pb2_grpc import PositionServiceStub
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    # Parse CLI args
+    args = setup_cli_args(cli.grpc_host, cli.log_level())
+
+    # Setup logging
+    setup_logging(level=args[LOG_LEVEL])
+
+    channel = grpc.insecure_channel(grpc_url(args[GRPC_HOST]))
+    stub = PositionServiceStub(channel)
+    client_info = ClientInfo(info="{0} profile client".format(socket.gethostname()))
+
+    try:
+        while True:
+            profile = stub.getProfile(client_info)
+            if not profile.enabled:
+                print("Profiling is not enabled, start line_follower.py with --profile")
+            else:
+                print("Loop {0:.1f} fps".format(profile.fps))
+                for stage in profile.stages:
+                    print("  {0:<12} p50 {1:7.2f} ms  p95 {2:7.2f} ms  p99 {3:7.2f} ms".format(stage.name,
+                                                                                          stage.p50_ms,
+                                                                                          stage.p95_ms,
+                                                                                          stage.p99_ms))
+            time.sleep(5)
+    except KeyboardInterrupt:
+        pass
+
+    logger.info("Exiting...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import logging
+from collections import OrderedDict
+from threading import Lock
+from timeit import default_timer
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RingBuffer(object):
+    def __init__(self, size):
+        self.__values = np.zeros(size, dtype=np.float64)
+        self.__pos = 0
+        self.__count = 0
+
+    @property
+    def count(self):
+        return self.__count
+
+    def add(self, value):
+        self.__values[self.__pos] = value
+        self.__pos = (self.__pos + 1) % len(self.__values)
+        self.__count += 1
+
+    def values(self):
+        return self.__values[:min(self.__count, len(self.__values))].copy()
+
+
+class StageProfiler(object):
+    def __init__(self, size=256, log_secs=10.0):
+        self.__size = size
+        self.__log_secs = log_secs
+        self.__lock = Lock()
+        self.__stages = OrderedDict()
+        self.__periods = RingBuffer(size)
+        self.__frame_start = None
+        self.__last = None
+        self.__last_log = default_timer()
+
+    @property
+    def enabled(self):
+        return True
+
+    def start_frame(self):
+        now = default_timer()
+        if self.__frame_start is not None:
+            with self.__lock:
+                self.__periods.add(now - self.__frame_start)
+        self.__frame_start = self.__last = now
+
+    def lap(self, name):
+        now = default_timer()
+        # Without start_frame() there is no start to time the first lap from
+        if self.__last is not None:
+            self.__record(name, now - self.__last)
+        self.__last = now
+
+    def end_frame(self):
+        now = default_timer()
+        if self.__frame_start is not None:
+            self.__record("total", now - self.__frame_start)
+        if self.__log_secs and now - self.__last_log >= self.__log_secs:
+            self.log_report()
+            self.__last_log = now
+
+    def __record(self, name, secs):
+        with self.__lock:
+            ring = self.__stages.get(name)
+            if ring is None:
+                ring = self.__stages[name] = RingBuffer(self.__size)
+            ring.add(secs)
+
+    def report(self):
+        """
+        Returns (fps, [(name, count, p50_ms, p95_ms, p99_ms), ...]) over the most recent frames.
+        """
+        with self.__lock:
+            periods = self.__periods.values()
+            snapshot = [(name, ring.count, ring.values()) for name, ring in self.__stages.items()]
+
+        fps = float(1.0 / periods.mean()) if len(periods) and periods.mean() > 0 else 0.0
+        stages = []
+        for name, count, values in snapshot:
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000.0
+            stages.append((name, count, float(p50), float(p95), float(p99)))
+        return fps, stages
+
+    def log_report(self):
+        fps, stages = self.report()
+        logger.info("Loop %.1f fps", fps)
+        for name, count, p50, p95, p99 in stages:
+            logger.info("  %-12s p50 %7.2f ms  p95 %7.2f ms  p99 %7.2f ms", name, p50, p95, p99)
+
+
+class NullProfiler(object):
+    @property
+    def enabled(self):
+        return False
+
+    def start_frame(self):
+        pass
+
+    def lap(self, name):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def report(self):
+        return 0.0, []
+
+    def log_report(self):
+        pass
@@ -1,35 +1,75 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
 import grpc
 
-import proto.position_service_pb2 as proto_dot_position__service__pb2
+from proto import position_service_pb2 as proto_dot_position__service__pb2
 
 
 class PositionServiceStub(object):
+    """Missing associated documentation comment in .proto file."""
+
     def __init__(self, channel):
         """Constructor.
-    
+
         Args:
-          channel: A grpc.Channel.
+            channel: A grpc.Channel.
         """
         self.registerClient = channel.unary_unary(
-            '/line_following.PositionService/registerClient',
-            request_serializer=proto_dot_position__service__pb2.ClientInfo.SerializeToString,
-            response_deserializer=proto_dot_position__service__pb2.ServerInfo.FromString,
-        )
+                '/line_following.PositionService/registerClient',
+                request_serializer=proto_dot_position__service__pb2.ClientInfo.SerializeToString,
+                response_deserializer=proto_dot_position__service__pb2.ServerInfo.FromString,
+                )
         self.getPositions = channel.unary_stream(
-            '/line_following.PositionService/getPositions',
-            request_serializer=proto_dot_position__service__pb2.ClientInfo.SerializeToString,
-            response_deserializer=proto_dot_position__service__pb2.Position.FromString,
-        )
+                '/line_following.PositionService/getPositions',
+                request_serializer=proto_dot_position__service__pb2.ClientInfo.SerializeToString,
+                response_deserializer=proto_dot_position__service__pb2.Position.FromString,
+                )
+        self.getPositionBatches = channel.unary_stream(
+                '/line_following.PositionService/getPositionBatches',
+                request_serializer=proto_dot_position__service__pb2.BatchRequest.SerializeToString,
+                response_deserializer=proto_dot_position__service__pb2.PositionBatch.FromString,
+                )
+        self.getProfile = channel.unary_unary(
+                '/line_following.PositionService/getProfile',
+                request_serializer=proto_dot_position__service__pb2.ClientInfo.SerializeToString,
+                response_deserializer=proto_dot_position__service__pb2.Profile.FromString,
+                )
+        self.getSubscriberStats = channel.unary_unary(
+                '/line_following.PositionService/getSubscriberStats',
+                request_serializer=proto_dot_position__service__pb2.ClientInfo.SerializeToString,
+                response_deserializer=proto_dot_position__service__pb2.ServerStats.FromString,
+                )
 
 
 class PositionServiceServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
     def registerClient(self, request, context):
+        """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
     def getPositions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getPositionBatches(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getProfile(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getSubscriberStats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
@@ -37,17 +77,122 @@ class PositionServiceServicer(object):
 
 def add_PositionServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
-        'registerClient': grpc.unary_unary_rpc_method_handler(
-            servicer.registerClient,
-            request_deserializer=proto_dot_position__service__pb2.ClientInfo.FromString,
-            response_serializer=proto_dot_position__service__pb2.ServerInfo.SerializeToString,
-        ),
-        'getPositions': grpc.unary_stream_rpc_method_handler(
-            servicer.getPositions,
-            request_deserializer=proto_dot_position__service__pb2.ClientInfo.FromString,
-            response_serializer=proto_dot_position__service__pb2.Position.SerializeToString,
-        ),
+            'registerClient': grpc.unary_unary_rpc_method_handler(
+                    servicer.registerClient,
+                    request_deserializer=proto_dot_position__service__pb2.ClientInfo.FromString,
+                    response_serializer=proto_dot_position__service__pb2.ServerInfo.SerializeToString,
+            ),
+            'getPositions': grpc.unary_stream_rpc_method_handler(
+                    servicer.getPositions,
+                    request_deserializer=proto_dot_position__service__pb2.ClientInfo.FromString,
+                    response_serializer=proto_dot_position__service__pb2.Position.SerializeToString,
+            ),
+            'getPositionBatches': grpc.unary_stream_rpc_method_handler(
+                    servicer.getPositionBatches,
+                    request_deserializer=proto_dot_position__service__pb2.BatchRequest.FromString,
+                    response_serializer=proto_dot_position__service__pb2.PositionBatch.SerializeToString,
+            ),
+            'getProfile': grpc.unary_unary_rpc_method_handler(
+                    servicer.getProfile,
+                    request_deserializer=proto_dot_position__service__pb2.ClientInfo.FromString,
+                    response_serializer=proto_dot_position__service__pb2.Profile.SerializeToString,
+            ),
+            'getSubscriberStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.getSubscriberStats,
+                    request_deserializer=proto_dot_position__service__pb2.ClientInfo.FromString,
+                    response_serializer=proto_dot_position__service__pb2.ServerStats.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
-        'line_following.PositionService', rpc_method_handlers)
+            'line_following.PositionService', rpc_method_handlers)
     server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class PositionService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def registerClient(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/line_following.PositionService/registerClient',
+            proto_dot_position__service__pb2.ClientInfo.SerializeToString,
+            proto_dot_position__service__pb2.ServerInfo.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def getPositions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/line_following.PositionService/getPositions',
+            proto_dot_position__service__pb2.ClientInfo.SerializeToString,
+            proto_dot_position__service__pb2.Position.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def getPositionBatches(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/line_following.PositionService/getPositionBatches',
+            proto_dot_position__service__pb2.BatchRequest.SerializeToString,
+            proto_dot_position__service__pb2.PositionBatch.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def getProfile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/line_following.PositionService/getProfile',
+            proto_dot_position__service__pb2.ClientInfo.SerializeToString,
+            proto_dot_position__service__pb2.Profile.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def getSubscriberStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/line_following.PositionService/getSubscriberStats',
+            proto_dot_position__service__pb2.ClientInfo.SerializeToString,
+            proto_dot_position__service__pb2.ServerStats.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
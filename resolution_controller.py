@@ -0,0 +1,92 @@
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+
+class ResolutionController(object):
+    """
+    Adjusts the image width so per-frame processing time fits within 1 / target_fps.
+    Processing cost is roughly proportional to pixel count, so width scales with the square root of the
+    time ratio.
+    """
+
+    def __init__(self,
+                 target_fps,
+                 width,
+                 min_width=200,
+                 max_width=2000,
+                 step=10,
+                 smoothing=0.1,
+                 hold_frames=30,
+                 headroom=0.7,
+                 max_increase=1.1):
+        if target_fps <= 0:
+            raise ValueError("target_fps must be positive")
+        self.__budget_secs = 1.0 / target_fps
+        self.__width = width
+        self.__min_width = min_width
+        self.__max_width = max_width
+        self.__step = step
+        self.__smoothing = smoothing
+        self.__hold_frames = hold_frames
+        self.__headroom = headroom
+        self.__max_increase = max_increase
+        self.__avg_secs = None
+        self.__frames = 0
+
+    @property
+    def width(self):
+        return self.__width
+
+    @width.setter
+    def width(self, width):
+        # Keep in step with manual width changes
+        if width != self.__width:
+            self.__width = width
+            self.__reset()
+
+    @property
+    def avg_secs(self):
+        return self.__avg_secs
+
+    def __reset(self):
+        self.__avg_secs = None
+        self.__frames = 0
+
+    def update(self, process_secs):
+        """
+        Records the processing time of one frame and returns a new width, or None if it should not change.
+        """
+        # Negative times come from clock steps, not from frames
+        if process_secs < 0:
+            return None
+        if self.__avg_secs is None:
+            self.__avg_secs = process_secs
+        else:
+            self.__avg_secs += self.__smoothing * (process_secs - self.__avg_secs)
+        self.__frames += 1
+
+        if self.__frames < self.__hold_frames:
+            return None
+
+        ratio = self.__avg_secs / self.__budget_secs
+        if ratio <= 0:
+            return None
+        if ratio > 1.0:
+            scale = math.sqrt(1.0 / ratio)
+        elif ratio < self.__headroom:
+            scale = min(math.sqrt(1.0 / ratio), self.__max_increase)
+        else:
+            return None
+
+        width = int(round(self.__width * scale / self.__step)) * self.__step
+        width = max(self.__min_width, min(self.__max_width, width))
+        if width == self.__width:
+            return None
+
+        logger.info("Changing width from %d to %d [%.1f ms per frame, budget %.1f ms]",
+                    self.__width, width, self.__avg_secs * 1000, self.__budget_secs * 1000)
+        self.__width = width
+        self.__reset()
+        return width
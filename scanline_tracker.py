@@ -0,0 +1,72 @@
+import logging
+
+import numpy as np
+
+from geometry import slope_degrees
+
+logger = logging.getLogger(__name__)
+
+# Fitted lines steeper than this are reported as vertical
+VERTICAL_SLOPE = 100.0
+
+
+class ScanlineTracker(object):
+    def __init__(self, segmenter, band_count=5, minimum_pixels=100, half_height=5, buffers=None):
+        if band_count < 2:
+            raise ValueError("At least 2 scanlines are required to fit a line")
+        self.__segmenter = segmenter
+        self.__band_count = band_count
+        self.__minimum_pixels = minimum_pixels
+        self.__half_height = half_height
+        self.__buffers = buffers
+
+    @property
+    def band_count(self):
+        return self.__band_count
+
+    def band_centers(self, img_height, focus_line_y):
+        # Evenly spaced from the top of the image down to the focus line, which is always the last band
+        top = min(self.__half_height, focus_line_y)
+        return np.linspace(top, focus_line_y, self.__band_count).astype(int)
+
+    def track(self, image, focus_line_y):
+        """
+        Returns (centroids, focus_img_x, line), where centroids is a list of (x, y) points, focus_img_x is
+        the centroid on the focus line (or None) and line is (slope, degrees, img_x, img_y) or None.
+        """
+        img_height, img_width = image.shape[:2]
+        band_height = 2 * self.__half_height + 1
+
+        centers = self.band_centers(img_height, focus_line_y)
+        offsets = np.arange(-self.__half_height, self.__half_height + 1)
+        rows = np.clip(centers[:, None] + offsets[None, :], 0, img_height - 1)
+
+        # Gather only the band rows and threshold them in a single pass
+        rows = rows.ravel()
+        out = self.__buffers.get("bands", (len(rows),) + image.shape[1:]) if self.__buffers else None
+        bands = np.take(image, rows, axis=0, out=out)
+        mask = self.__segmenter.mask(bands)
+
+        # Per-band column histograms of target pixels
+        columns = (mask.reshape(self.__band_count, band_height, img_width) > 0).sum(axis=1)
+        counts = columns.sum(axis=1)
+        found = counts >= self.__minimum_pixels
+
+        xs = np.arange(img_width)
+        centroid_x = columns.dot(xs)[found] / counts[found].astype(float)
+        centroid_y = centers[found]
+        centroids = [(int(x), int(y)) for x, y in zip(centroid_x, centroid_y)]
+
+        focus_img_x = centroids[-1][0] if found[-1] else None
+
+        # Bands collapse onto one row when the focus line is near the top, and a fit needs two rows
+        if len(np.unique(centroid_y)) < 2:
+            return centroids, focus_img_x, None
+
+        # Fit x as a function of y, since a followed line is mostly vertical in the image
+        inv_slope, x_inter = np.polyfit(centroid_y, centroid_x, 1)
+        img_y = int(centroid_y.mean())
+        img_x = int(inv_slope * img_y + x_inter)
+
+        slope = None if abs(inv_slope) < 1 / VERTICAL_SLOPE else float(1 / inv_slope)
+        return centroids, focus_img_x, (slope, slope_degrees(slope), img_x, img_y)
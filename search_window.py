@@ -0,0 +1,80 @@
+import logging
+import time
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+class SearchWindow(object):
+    """
+    Keeps the window the next frame is searched in: the last contour bounding box, shifted by its motion
+    since the frame before and expanded by margin plus that motion. The window is an immutable tuple
+    swapped with a single assignment, so measuring threads can read it while the loop thread updates it.
+    """
+
+    def __init__(self, margin=30, log_secs=10.0):
+        self.__margin = margin
+        self.__log_secs = log_secs
+        self.__last_log = time.time()
+        self.__window = None
+        self.__center = None
+        self.windowed = 0
+        self.full = 0
+
+    def reset(self):
+        self.__window = None
+        self.__center = None
+
+    def window(self, img_width, img_height, focus_y0, focus_y1):
+        """
+        Returns (x0, y0, x1, y1) to search, always including the focus band rows, or None for a full frame.
+        """
+        window = self.__window
+        if window is None:
+            return None
+        x0, y0, x1, y1 = window
+        x0, x1 = max(x0, 0), min(x1, img_width)
+        y0, y1 = max(min(y0, focus_y0), 0), min(max(y1, focus_y1), img_height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def update(self, contour, window):
+        """
+        Records the contour found in a frame (None if lost) and the window it was found in.
+        """
+        if window is None:
+            self.full += 1
+        else:
+            self.windowed += 1
+
+        if contour is None:
+            self.reset()
+        else:
+            x, y, w, h = cv2.boundingRect(contour)
+            center = x + w / 2.0, y + h / 2.0
+            dx, dy = (center[0] - self.__center[0], center[1] - self.__center[1]) if self.__center else (0, 0)
+            mx, my = self.__margin + int(abs(dx)), self.__margin + int(abs(dy))
+            self.__window = (int(x + dx) - mx, int(y + dy) - my, int(x + dx) + w + mx, int(y + dy) + h + my)
+            self.__center = center
+
+        if self.__log_secs and time.time() - self.__last_log >= self.__log_secs:
+            self.log_stats()
+            self.__last_log = time.time()
+
+    def log_stats(self):
+        total = self.windowed + self.full
+        logger.info("Searched %d frames in a window, %d full frames [%.0f%% windowed]",
+                    self.windowed, self.full, 100.0 * self.windowed / total if total else 0.0)
+
+
+def touches_edge(contour, window, img_width, img_height):
+    """
+    Returns True if contour reaches a side of window that is not also the image border, meaning the line
+    may continue outside the window.
+    """
+    x0, y0, x1, y1 = window
+    x, y, w, h = cv2.boundingRect(contour)
+    return (x <= x0 and x0 > 0) or (x + w >= x1 and x1 < img_width) \
+           or (y <= y0 and y0 > 0) or (y + h >= y1 and y1 < img_height)
@@ -0,0 +1,229 @@
+import logging
+import mmap
+import os
+import struct
+import time
+from threading import Lock
+
+from arc852.grpc_support import TimeoutException
+from arc852.grpc_support import grpc_url
+
+from latency import is_local_host
+from position_client import PositionClient
+from position_client import PositionRecord
+
+logger = logging.getLogger(__name__)
+
+SHM_DIR = "/dev/shm"
+DEFAULT_PORT = 50051
+
+# Record layout: uint32 sequence, uint32 writer pid (0 once closed), the Position fields, then a copy of the
+# sequence
+SEQ = struct.Struct("<I")
+PID = struct.Struct("<I")
+PID_OFFSET = 4
+PAYLOAD = struct.Struct("<8i4d")
+PAYLOAD_OFFSET = 8
+TRAILER_OFFSET = PAYLOAD_OFFSET + PAYLOAD.size
+SIZE = TRAILER_OFFSET + SEQ.size
+
+# Reads retried while a write is in progress, before giving up until the next poll
+MAX_READ_RETRIES = 1000
+
+
+def shm_path(port=None, source=0):
+    """
+    Each source has its own record, so sources do not overwrite each other's positions.
+    """
+    name = "line_following_{0}".format(port if port else DEFAULT_PORT)
+    if source:
+        name += "_{0}".format(source)
+    return os.path.join(SHM_DIR, name)
+
+
+def writer_alive(path):
+    """
+    Returns True if path holds a record whose writer process is still running.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(PAYLOAD_OFFSET)
+    except (IOError, OSError):
+        return False
+    if len(header) < PAYLOAD_OFFSET:
+        return False
+    pid = PID.unpack_from(header, PID_OFFSET)[0]
+    if pid == 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class ShmPositionWriter(object):
+    """
+    Writes the latest position into a fixed-layout memory-mapped seqlock record. The sequence is odd while a
+    write is in progress, and is repeated after the payload, so readers retry instead of seeing a torn record.
+    Python has no memory barriers, so on weakly ordered CPUs (multi-core ARM) a torn read is unlikely but
+    still possible. close() marks the record closed and removes the file.
+    """
+
+    def __init__(self, path):
+        self.__path = path
+        self.__lock = Lock()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < SIZE:
+                os.ftruncate(fd, SIZE)
+            self.__mm = mmap.mmap(fd, SIZE)
+        finally:
+            os.close(fd)
+        # Continue the sequence of a previous writer, so existing readers keep working across restarts
+        seq = SEQ.unpack_from(self.__mm, 0)[0]
+        self.__seq = seq + (seq & 1)
+        PID.pack_into(self.__mm, PID_OFFSET, os.getpid())
+        logger.info("Writing positions to %s", path)
+
+    @property
+    def path(self):
+        return self.__path
+
+    def write(self, id, in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc,
+              capture_wall=0.0, capture_mono=0.0, processed_mono=0.0, published_mono=0.0, source=0):
+        # The lock keeps close() from unmapping the record under a write
+        with self.__lock:
+            mm = self.__mm
+            if mm is None:
+                return
+            SEQ.pack_into(mm, 0, (self.__seq + 1) & 0xFFFFFFFF)
+            PAYLOAD.pack_into(mm, PAYLOAD_OFFSET, id, in_focus, mid_offset, degrees, mid_line_cross, width,
+                              middle_inc, source, capture_wall, capture_mono, processed_mono, published_mono)
+            self.__seq = (self.__seq + 2) & 0xFFFFFFFF
+            SEQ.pack_into(mm, TRAILER_OFFSET, self.__seq)
+            SEQ.pack_into(mm, 0, self.__seq)
+
+    def close(self):
+        with self.__lock:
+            if self.__mm is None:
+                return
+            PID.pack_into(self.__mm, PID_OFFSET, 0)
+            self.__mm.close()
+            self.__mm = None
+        try:
+            os.remove(self.__path)
+        except OSError as e:
+            logger.warning("Unable to remove %s [%s]", self.__path, e)
+
+
+class ShmPositionClient(object):
+    """
+    Same reading interface as PositionClient, but reads the record written by ShmPositionWriter with plain
+    memory loads instead of a gRPC stream.
+    """
+
+    def __init__(self, path, poll_secs=0.0005):
+        self.__path = path
+        self.__poll_secs = poll_secs
+        self.__mm = None
+        self.__stopped = False
+        self.__shm_seq = None
+        self.__seq = 0
+        self.__read_seq = 0
+        self.__latest = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return self
+
+    @property
+    def stopped(self):
+        return self.__stopped
+
+    def start(self):
+        fd = os.open(self.__path, os.O_RDONLY)
+        try:
+            self.__mm = mmap.mmap(fd, SIZE, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        logger.info("Reading positions from %s", self.__path)
+
+    def stop(self):
+        self.__stopped = True
+        if self.__mm is not None:
+            self.__mm.close()
+            self.__mm = None
+
+    def __read(self):
+        # Returns (0, None) if no consistent record could be read, e.g. the writer died mid-write
+        mm = self.__mm
+        for i in range(MAX_READ_RETRIES):
+            seq1 = SEQ.unpack_from(mm, 0)[0]
+            if seq1 & 1:
+                continue
+            payload = PAYLOAD.unpack_from(mm, PAYLOAD_OFFSET)
+            # The trailer catches payload stores seen out of order with the leading sequence
+            if SEQ.unpack_from(mm, TRAILER_OFFSET)[0] == seq1 and SEQ.unpack_from(mm, 0)[0] == seq1:
+                return seq1, payload
+        return 0, None
+
+    @property
+    def latest(self):
+        if self.__mm is None:
+            return self.__latest
+        # Sequence 0 means nothing has been written yet, or no consistent record was read
+        shm_seq, payload = self.__read()
+        if shm_seq and shm_seq != self.__shm_seq:
+            self.__shm_seq = shm_seq
+            self.__seq += 1
+            id, in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc, source, capture_wall, \
+                capture_mono, processed_mono, published_mono = payload
+            self.__latest = PositionRecord(self.__seq, id, bool(in_focus), mid_offset, degrees, mid_line_cross,
+                                           width, middle_inc, capture_wall, capture_mono, processed_mono,
+                                           published_mono, time.time(), time.monotonic(), source)
+        return self.__latest
+
+    # Blocking
+    def wait_for(self, seq, timeout=None):
+        end = None if timeout is None else time.time() + timeout
+        while not self.__stopped:
+            val = self.latest
+            if val is not None and val.seq > seq:
+                return val
+            if end is not None and time.time() >= end:
+                raise TimeoutException
+            time.sleep(self.__poll_secs)
+        return None
+
+    # Blocking
+    def get_position(self, timeout=None):
+        val = self.wait_for(self.__read_seq, timeout)
+        if val is not None:
+            self.__read_seq = val.seq
+        return val
+
+    def get_positions(self):
+        while not self.__stopped:
+            yield self.get_position()
+
+
+def open_position_client(hostname, source=0):
+    """
+    Returns a ShmPositionClient for source when the server is on this host and a running process publishes
+    shared memory, otherwise a PositionClient subscribed to source. A record left behind by a dead server is
+    ignored.
+    """
+    url = grpc_url(hostname)
+    if is_local_host(url):
+        port = url.rsplit(":", 1)[1]
+        path = shm_path(port, source)
+        if writer_alive(path):
+            return ShmPositionClient(path)
+    return PositionClient(hostname, sources=[source] if source else None)
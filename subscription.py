@@ -0,0 +1,69 @@
+import logging
+
+from proto.position_service_pb2 import Position
+
+logger = logging.getLogger(__name__)
+
+POSITION_FIELDS = [f.name for f in Position.DESCRIPTOR.fields]
+
+
+class SubscriptionFilter(object):
+    """
+    Per-subscriber options from ClientInfo: deadbands on mid_offset and degrees, a max rate, a field mask and
+    the sources to send. Deadbands and the max rate apply to each source separately.
+    """
+
+    def __init__(self, mid_offset_deadband=0, degrees_deadband=0, max_rate=0.0, fields=None, sources=None):
+        invalid = [name for name in fields or [] if name not in POSITION_FIELDS]
+        if invalid:
+            raise ValueError("Invalid position fields: {0}".format(", ".join(invalid)))
+        self.__mid_offset_deadband = mid_offset_deadband
+        self.__degrees_deadband = degrees_deadband
+        self.__min_interval_secs = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.__fields = ["id", "source"] + [name for name in fields if name not in ("id", "source")] \
+            if fields else None
+        self.__sources = set(sources) if sources else None
+        self.__last = {}
+
+    @property
+    def min_interval_secs(self):
+        return self.__min_interval_secs
+
+    def wanted(self, val):
+        return self.__sources is None or val.source in self.__sources
+
+    def accept(self, val):
+        """
+        Returns False if val is within the deadbands of the last value sent from its source.
+        """
+        last = self.__last.get(val.source)
+        if last is None or val.in_focus != last.in_focus:
+            return True
+        if not self.__mid_offset_deadband and not self.__degrees_deadband:
+            return True
+        if self.__mid_offset_deadband and abs(val.mid_offset - last.mid_offset) >= self.__mid_offset_deadband:
+            return True
+        return bool(self.__degrees_deadband) and abs(val.degrees - last.degrees) >= self.__degrees_deadband
+
+    def sent(self, val):
+        """
+        Records val as sent and returns the message to send, with unmasked fields left at their defaults.
+        """
+        self.__last[val.source] = val
+        if self.__fields is None:
+            return val
+        return Position(**{name: getattr(val, name) for name in self.__fields})
+
+
+def subscription_filter(client_info):
+    """
+    Returns a SubscriptionFilter for the options in client_info, or None if it has none set.
+    """
+    if not (client_info.mid_offset_deadband or client_info.degrees_deadband or client_info.max_rate
+            or client_info.fields or client_info.sources):
+        return None
+    return SubscriptionFilter(client_info.mid_offset_deadband,
+                              client_info.degrees_deadband,
+                              client_info.max_rate,
+                              list(client_info.fields),
+                              list(client_info.sources))
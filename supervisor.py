@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import time
+
+import arc852.cli_args  as cli
+from arc852.camera import Camera
+from arc852.constants import LOG_LEVEL
+from arc852.utils import setup_logging
+
+from fanout import OVERFLOW_COALESCE
+from fanout import OVERFLOW_POLICIES
+from headless import DisabledImageServer
+from line_follower import LineFollower
+from position_server import PositionServer
+
+logger = logging.getLogger(__name__)
+
+# LineFollower arguments a worker config does not have to set, matching the line_follower.py CLI defaults
+LINE_DEFAULTS = dict(focus_line_pct=10,
+                     width=400,
+                     middle_percent=15,
+                     minimum_pixels=100,
+                     hsv_range=20,
+                     grpc_port=None,
+                     report_midline=False,
+                     display=False,
+                     usb_camera=False,
+                     flip_x=False,
+                     flip_y=False,
+                     camera_name="",
+                     leds=False,
+                     http_host=None,
+                     http_delay_secs=0.25,
+                     http_file=None,
+                     http_verbose=False)
+
+# LineFollower arguments a line can set. Workers only run process_image(), so display, LEDs, HTTP, profiling,
+# capture threads, frame pools and per-line servers do not apply, and those arguments are rejected.
+LINE_ARGS = ["bgr_color",
+             "focus_line_pct",
+             "width",
+             "middle_percent",
+             "minimum_pixels",
+             "hsv_range",
+             "report_midline",
+             "flip_x",
+             "flip_y",
+             "tracker",
+             "scanline_count",
+             "hsv_lut",
+             "smoothing",
+             "coast_secs",
+             "lead_ms",
+             "search_window",
+             "window_margin",
+             "resize"]
+
+# Worker entries also take defaults for their lines
+WORKER_ARGS = ["core", "lines", "usb_camera"] + LINE_ARGS
+
+
+class QueuePositionServer(object):
+    """
+    Stands in for PositionServer inside a worker process and forwards positions to the supervisor.
+    """
+
+    def __init__(self, source, positions):
+        self.__source = source
+        self.__positions = positions
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def write_position(self, in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc,
+                       capture_wall=0.0, capture_mono=0.0, processed_mono=0.0):
+        self.__positions.put((self.__source, in_focus, mid_offset, degrees, mid_line_cross, width, middle_inc,
+                              capture_wall, capture_mono, processed_mono))
+
+
+def line_args(worker, line):
+    """
+    Returns the LineFollower arguments for one line of a worker config. Worker level values are defaults
+    for each of its lines.
+    """
+    args = dict(LINE_DEFAULTS)
+    args.update((k, v) for k, v in worker.items() if k not in ("core", "lines"))
+    args.update((k, v) for k, v in line.items() if k != "source")
+    return args
+
+
+def validate_config(workers):
+    """
+    Raises ValueError if the worker configs are not usable.
+    """
+    sources = set()
+    for i, worker in enumerate(workers):
+        if not worker.get("lines"):
+            raise ValueError("Worker {0} has no lines".format(i))
+        invalid = [k for k in worker if k not in WORKER_ARGS]
+        if invalid:
+            raise ValueError("Unsupported worker {0} arguments: {1}".format(i, ", ".join(invalid)))
+        for line in worker["lines"]:
+            if "source" not in line:
+                raise ValueError("Line in worker {0} has no source id".format(i))
+            if line["source"] in sources:
+                raise ValueError("Duplicate source id {0}".format(line["source"]))
+            sources.add(line["source"])
+            invalid = [k for k in line if k != "source" and k not in LINE_ARGS]
+            if invalid:
+                raise ValueError("Unsupported arguments for source {0}: {1}".format(line["source"],
+                                                                                  ", ".join(invalid)))
+            if "bgr_color" not in line_args(worker, line):
+                raise ValueError("Source {0} has no bgr_color".format(line["source"]))
+
+
+def run_worker(worker, core, positions, stop_event, log_level):
+    """
+    Entry point of a worker process. Reads its camera and runs each frame through one LineFollower per line.
+    """
+    setup_logging(level=log_level)
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core})
+        logger.info("Worker %d pinned to core %d", os.getpid(), core)
+
+    cam = Camera(usb_camera=worker.get("usb_camera", False))
+    followers = [LineFollower(cam=cam,
+                              position_server=QueuePositionServer(line["source"], positions),
+                              image_server=DisabledImageServer(),
+                              **line_args(worker, line))
+                 for line in worker["lines"]]
+    try:
+        while cam.is_open() and not stop_event.is_set():
+            # Like LineFollower.start(), a bad frame or a camera error does not end the worker
+            try:
+                image = cam.read()
+                capture_wall, capture_mono = time.time(), time.monotonic()
+                # process_image() does not modify the captured frame, so the lines can share it
+                for follower in followers:
+                    follower.process_image(image, capture_wall, capture_mono)
+            except KeyboardInterrupt as e:
+                raise e
+            except BaseException as e:
+                logger.error("Unexpected error in worker %d [%s]", os.getpid(), e, exc_info=True)
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cam.close()
+
+
+class Supervisor(object):
+    """
+    Runs one vision worker process per camera, each pinned to a core, and publishes the positions of all
+    of them through a single PositionServer, tagged with the source id of the line they came from.
+    """
+
+    def __init__(self, workers, grpc_port=None, queue_size=10, overflow=OVERFLOW_COALESCE, shm=False,
+                 log_level=logging.INFO):
+        validate_config(workers)
+        self.__workers = workers
+        self.__log_level = log_level
+        self.__position_server = PositionServer(grpc_port, queue_size=queue_size, overflow=overflow, shm=shm)
+        # spawn, so workers do not inherit the gRPC server state
+        self.__context = multiprocessing.get_context("spawn")
+        self.__positions = self.__context.Queue()
+        self.__stop_event = self.__context.Event()
+        self.__processes = []
+        self.__stopped = False
+
+    def __core(self, index):
+        # Core 0 is left for the supervisor and the gRPC server
+        core = self.__workers[index].get("core")
+        if core is None:
+            cpu_count = multiprocessing.cpu_count()
+            core = (index + 1) % cpu_count if cpu_count > 1 else None
+        return core
+
+    def start(self):
+        self.__position_server.start()
+        for i, worker in enumerate(self.__workers):
+            process = self.__context.Process(target=run_worker,
+                                             args=(worker, self.__core(i), self.__positions, self.__stop_event,
+                                                   self.__log_level),
+                                             name="worker-{0}".format(i))
+            process.start()
+            self.__processes.append(process)
+        logger.info("Started %d workers", len(self.__processes))
+
+        while not self.__stopped:
+            try:
+                val = self.__positions.get(timeout=0.5)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self.__processes):
+                    logger.error("All workers exited")
+                    break
+                continue
+            source, fields = val[0], val[1:]
+            self.__position_server.write_position(*fields, source=source)
+
+    def stop(self):
+        self.__stopped = True
+        self.__stop_event.set()
+        for process in self.__processes:
+            process.join(5.0)
+            if process.is_alive():
+                logger.warning("Terminating %s", process.name)
+                process.terminate()
+        self.__position_server.stop()
+
+
+def main():
+    # Parse CLI args
+    parser = cli.argparse.ArgumentParser()
+    parser.add_argument("-c", "--config", required=True, help="JSON worker config file")
+    cli.grpc_port(parser)
+    parser.add_argument("--queue", default=10, type=int, dest="queue_size",
+                        help="Per-subscriber position queue size [10]")
+    parser.add_argument("--overflow", default=OVERFLOW_COALESCE, choices=OVERFLOW_POLICIES,
+                        help="Policy when a subscriber queue is full [{0}]".format(OVERFLOW_COALESCE))
+    parser.add_argument("--shm", default=False, action="store_true",
+                        help="Also publish each source's positions in shared memory for same-host readers [false]")
+    cli.log_level(parser)
+    args = vars(parser.parse_args())
+
+    # Setup logging
+    setup_logging(level=args[LOG_LEVEL])
+
+    with open(args["config"]) as f:
+        workers = json.load(f)["workers"]
+
+    try:
+        supervisor = Supervisor(workers,
+                                grpc_port=args["grpc_port"],
+                                queue_size=args["queue_size"],
+                                overflow=args["overflow"],
+                                shm=args["shm"],
+                                log_level=args[LOG_LEVEL])
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        supervisor.start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.stop()
+
+    logger.info("Exiting...")
+
+
+if __name__ == "__main__":
+    main()
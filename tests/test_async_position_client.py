@@ -0,0 +1,14 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("arc852")
+pytest.importorskip("grpc")
+
+from async_position_client import AsyncPositionClient
+
+
+def test_stop_before_start():
+    client = AsyncPositionClient("localhost:1")
+    asyncio.run(client.stop())
+    assert client.stopped
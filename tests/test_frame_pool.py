@@ -0,0 +1,21 @@
+import time
+
+from frame_pool import OrderedFramePool
+
+
+def measure(i):
+    if i == 3:
+        raise ValueError("bad frame")
+    time.sleep(0.001 * (i % 3))
+    return i
+
+
+def test_failed_frame_is_discarded():
+    pool = OrderedFramePool(measure, workers=2, max_wait_secs=1.0, log_secs=0)
+    released = []
+    for i in range(10):
+        released.extend(result for frame_id, result in pool.submit(i))
+    released.extend(result for frame_id, result in pool.drain())
+    pool.shutdown()
+    assert released == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert pool.stats()[:2] == (9, 1)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from geometry import compute_position
+from geometry import compute_positions
+from geometry import slope_degrees
+
+FIELDS = ["in_focus", "mid_offset", "degrees", "mid_line_cross", "width", "middle_inc"]
+
+
+def random_frames(n, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n):
+        img_width = int(rng.integers(200, 2001))
+        img_height = img_width * 3 // 4
+        focus_img_x = None if rng.random() < 0.1 else int(rng.integers(0, img_width))
+        line = None
+        kind = rng.random()
+        if kind >= 0.1:
+            if kind < 0.2:
+                slope = None
+            elif kind < 0.25:
+                slope = 0.0
+            else:
+                slope = float(rng.normal(0, 5))
+            line = (slope, slope_degrees(slope), int(rng.integers(0, img_width)), int(rng.integers(0, img_height)))
+        frames.append((focus_img_x, line, img_width, img_height, int(rng.integers(1, 100)), int(rng.integers(2, 99))))
+    return frames
+
+
+def test_compute_positions_matches_compute_position():
+    frames = random_frames(20000)
+    nan = float("nan")
+    batch = compute_positions([nan if f[0] is None else f[0] for f in frames],
+                              [nan if f[1] is None or f[1][0] is None else f[1][0] for f in frames],
+                              [0 if f[1] is None else f[1][1] for f in frames],
+                              [nan if f[1] is None else f[1][2] for f in frames],
+                              [nan if f[1] is None else f[1][3] for f in frames],
+                              [f[2] for f in frames],
+                              [f[3] for f in frames],
+                              [f[4] for f in frames],
+                              [f[5] for f in frames])
+    for i, frame in enumerate(frames):
+        expected = compute_position(*frame)
+        # No line reports degrees as None, which is published as 0
+        expected = expected[:2] + (0 if expected[2] is None else expected[2],) + expected[3:]
+        actual = tuple(batch[name][i].item() for name in FIELDS)
+        assert actual == expected, (frame, actual, expected)
+
+
+def test_compute_positions_scalars():
+    fields = compute_positions(250, float("nan"), 90, 250, 100, 400, 300, 10, 15)
+    assert tuple(fields[name].item() for name in FIELDS) == compute_position(250, (None, 90, 250, 100),
+                                                                             400, 300, 10, 15)
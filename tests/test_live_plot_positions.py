@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("arc852")
+pytest.importorskip("grpc")
+pytest.importorskip("matplotlib")
+
+from live_plot_positions import PositionRing
+from live_plot_positions import decimate
+from position_client import PositionRecord
+
+
+def record(seq, mid_offset, capture_secs, received_secs):
+    return PositionRecord(seq, seq, True, mid_offset, 0, -1, 400, 60, capture_secs + 1000.0, capture_secs, 0.0,
+                          0.0, received_secs + 1000.0, received_secs, 0)
+
+
+def test_decimate_keeps_extremes():
+    times = np.arange(1000, dtype=np.float64)
+    values = np.zeros(1000)
+    values[500] = 99
+    dec_times, dec_values = decimate(times, values, 100)
+    assert len(dec_times) == len(dec_values) <= 100
+    assert dec_values.max() == 99
+
+
+def test_decimate_rejects_too_few_points():
+    with pytest.raises(ValueError):
+        decimate(np.arange(10.0), np.arange(10.0), 1)
+
+
+def test_ring_places_samples_at_capture_time():
+    # A batch of three samples captured 10 ms apart, received together
+    batch = [record(i, i, 5.0 + 0.01 * i, 5.1) for i in range(3)]
+    for local, offset in [(True, 0.0), (False, 1000.0)]:
+        ring = PositionRing(10, local=local)
+        ring.add_records(batch)
+        times, values = ring.snapshot(offset + 5.005)
+        assert np.allclose(times, [offset + 5.01, offset + 5.02])
+        assert list(values) == [1, 2]
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from position_filter import FILTERS
+from position_filter import PositionFilter
+
+FPS = 30.0
+SPEED = 100.0
+NOISE = 3.0
+LATENCY_SECS = 0.05
+
+
+def track(frames=300, seed=1):
+    """
+    Constant velocity mid_offsets with measurement noise, as (capture_secs, true, measured).
+    """
+    rng = np.random.default_rng(seed)
+    secs = np.arange(frames) / FPS
+    true = -150 + SPEED * secs
+    return secs, true, true + rng.normal(0, NOISE, frames)
+
+
+@pytest.mark.parametrize("kind", FILTERS)
+def test_filter_reduces_error(kind):
+    secs, true, measured = track()
+    position_filter = PositionFilter(kind)
+    raw_errors = []
+    filtered_errors = []
+    for capture_secs, z in zip(secs, measured):
+        publish_secs = capture_secs + LATENCY_SECS
+        in_focus, mid_offset, degrees = position_filter.update(True, int(round(z)), 45, capture_secs, publish_secs)
+        assert in_focus
+        # Error against the true position at publish time, after the filter settles
+        if capture_secs > 1.0:
+            actual = -150 + SPEED * publish_secs
+            raw_errors.append(abs(z - actual))
+            filtered_errors.append(abs(mid_offset - actual))
+    assert np.mean(filtered_errors) < 0.6 * np.mean(raw_errors)
+
+
+@pytest.mark.parametrize("kind", FILTERS)
+def test_filter_coasts_through_dropouts(kind):
+    secs, true, measured = track()
+    position_filter = PositionFilter(kind, coast_secs=0.2)
+    missed = set(range(150, 154))
+    lost = set(range(200, 220))
+    for i, (capture_secs, z) in enumerate(zip(secs, measured)):
+        seen = i not in missed and i not in lost
+        in_focus, mid_offset, degrees = position_filter.update(seen, int(round(z)) if seen else 0,
+                                                               45 if seen else None, capture_secs, capture_secs)
+        if i in missed:
+            # A four-frame dropout is within coast_secs and is bridged by the prediction
+            assert in_focus
+            assert abs(mid_offset - true[i]) < 5 * NOISE
+            assert degrees == 45
+        elif i in lost and capture_secs - secs[min(lost) - 1] > 0.2:
+            assert not in_focus
+            assert mid_offset == 0
+    assert position_filter.coasted >= len(missed)
@@ -0,0 +1,22 @@
+from profiler import StageProfiler
+
+
+def test_lap_without_start_frame():
+    profiler = StageProfiler(log_secs=0)
+    profiler.lap("resize")
+    profiler.lap("track")
+    profiler.end_frame()
+    fps, stages = profiler.report()
+    assert [name for name, count, p50, p95, p99 in stages] == ["track"]
+
+
+def test_frame_stages():
+    profiler = StageProfiler(log_secs=0)
+    for i in range(3):
+        profiler.start_frame()
+        profiler.lap("resize")
+        profiler.lap("track")
+        profiler.end_frame()
+    fps, stages = profiler.report()
+    assert [(name, count) for name, count, p50, p95, p99 in stages] == [("resize", 3), ("track", 3), ("total", 3)]
+    assert fps > 0
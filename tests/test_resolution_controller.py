@@ -0,0 +1,28 @@
+from resolution_controller import ResolutionController
+
+
+def run(controller, secs, frames=30):
+    widths = [controller.update(secs) for i in range(frames)]
+    return [w for w in widths if w is not None]
+
+
+def test_shrinks_when_over_budget():
+    controller = ResolutionController(30, 800)
+    assert run(controller, 2.0 / 30) == [570]
+
+
+def test_grows_with_headroom():
+    controller = ResolutionController(30, 400)
+    assert run(controller, 0.1 / 30) == [440]
+
+
+def test_holds_within_budget():
+    controller = ResolutionController(30, 400)
+    assert run(controller, 0.8 / 30) == []
+
+
+def test_ignores_clock_steps():
+    controller = ResolutionController(30, 400)
+    assert run(controller, -0.5) == []
+    assert run(controller, 0.0) == []
+    assert controller.width == 400
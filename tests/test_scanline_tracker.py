@@ -0,0 +1,32 @@
+import warnings
+
+import cv2
+import numpy as np
+
+from hsv_threshold import HsvThreshold
+from scanline_tracker import ScanlineTracker
+
+BGR = (174, 56, 5)
+
+
+def line_image():
+    image = np.full((300, 400, 3), 200, dtype=np.uint8)
+    cv2.line(image, (150, 299), (250, 0), BGR, 20)
+    return image
+
+
+def test_fits_line():
+    tracker = ScanlineTracker(HsvThreshold(BGR, 20), band_count=5, minimum_pixels=20)
+    centroids, focus_img_x, line = tracker.track(line_image(), 270)
+    assert len(centroids) == 5
+    slope, degrees, img_x, img_y = line
+    assert 70 < abs(degrees) < 80
+
+
+def test_collapsed_bands_have_no_line():
+    tracker = ScanlineTracker(HsvThreshold(BGR, 20), band_count=5, minimum_pixels=20)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        centroids, focus_img_x, line = tracker.track(line_image(), 3)
+    assert focus_img_x is not None
+    assert line is None
@@ -0,0 +1,107 @@
+import mmap
+import os
+import time
+
+import pytest
+
+pytest.importorskip("arc852")
+pytest.importorskip("grpc")
+
+from arc852.grpc_support import TimeoutException
+
+from geometry import compute_position
+from position_client import PositionClient
+from position_server import PositionServer
+from shm_positions import PID
+from shm_positions import PID_OFFSET
+from shm_positions import SEQ
+from shm_positions import SIZE
+from shm_positions import ShmPositionClient
+from shm_positions import ShmPositionWriter
+from shm_positions import open_position_client
+from shm_positions import shm_path
+from shm_positions import writer_alive
+
+
+def unused_port():
+    return 50000 + os.getpid() % 10000
+
+
+def test_writer_round_trip(tmp_path):
+    path = str(tmp_path / "positions")
+    writer = ShmPositionWriter(path)
+    writer.write(7, True, -12, 45, 30, 400, 60, 1.0, 2.0, 3.0, 4.0, source=2)
+    with ShmPositionClient(path) as client:
+        val = client.latest
+    writer.close()
+    assert (val.id, val.in_focus, val.mid_offset, val.degrees, val.mid_line_cross, val.source) == \
+           (7, True, -12, 45, 30, 2)
+
+
+def test_lost_line_is_published():
+    port = unused_port()
+    server = PositionServer(port, shm=True)
+    try:
+        # No line found, so degrees and mid_line_cross are None
+        server.write_position(*compute_position(None, None, 400, 300, 10, 15))
+        with ShmPositionClient(shm_path(port)) as client:
+            val = client.latest
+        assert (val.in_focus, val.mid_offset, val.degrees, val.mid_line_cross, val.width) == (False, 0, 0, -1, 400)
+        assert server.id == 1
+    finally:
+        server.stop()
+    assert not os.path.exists(shm_path(port))
+
+
+def test_dead_writer_is_ignored():
+    port = unused_port()
+    path = shm_path(port)
+    writer = ShmPositionWriter(path)
+    writer.write(1, True, 5, 10, 20, 400, 60)
+    assert writer_alive(path)
+    assert isinstance(open_position_client("localhost:{0}".format(port)), ShmPositionClient)
+
+    # A record left behind by a process that no longer runs
+    with open(path, "r+b") as f:
+        mm = mmap.mmap(f.fileno(), SIZE)
+        PID.pack_into(mm, PID_OFFSET, 0x7FFFFFF0)
+        mm.close()
+    try:
+        assert not writer_alive(path)
+        assert isinstance(open_position_client("localhost:{0}".format(port)), PositionClient)
+    finally:
+        writer.close()
+    assert not os.path.exists(path)
+    assert not writer_alive(path)
+
+
+def test_writer_died_mid_write(tmp_path):
+    path = str(tmp_path / "positions")
+    writer = ShmPositionWriter(path)
+    writer.write(1, True, 5, 10, 20, 400, 60)
+    with open(path, "r+b") as f:
+        mm = mmap.mmap(f.fileno(), SIZE)
+        SEQ.pack_into(mm, 0, 3)
+        mm.close()
+    with ShmPositionClient(path) as client:
+        start = time.monotonic()
+        with pytest.raises(TimeoutException):
+            client.get_position(timeout=0.2)
+        assert time.monotonic() - start < 2.0
+    writer.close()
+
+
+def test_sources_have_separate_records():
+    port = unused_port()
+    server = PositionServer(port, shm=True)
+    try:
+        server.write_position(True, 10, 45, 30, 400, 60, source=1)
+        server.write_position(True, -20, 45, 30, 400, 60, source=2)
+        server.write_position(True, 11, 45, 30, 400, 60, source=1)
+        for source, mid_offset in [(1, 11), (2, -20)]:
+            with open_position_client("localhost:{0}".format(port), source=source) as client:
+                val = client.latest
+            assert (val.source, val.mid_offset) == (source, mid_offset)
+    finally:
+        server.stop()
+    assert not os.path.exists(shm_path(port, 1)) and not os.path.exists(shm_path(port, 2))
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.protobuf")
+
+from fanout import OVERFLOW_COALESCE
+from fanout import OVERFLOW_DROP_OLDEST
+from fanout import Subscriber
+from proto.position_service_pb2 import Position
+from subscription import SubscriptionFilter
+
+
+def position(id, mid_offset, source=0, degrees=45):
+    return Position(id=id, in_focus=True, mid_offset=mid_offset, degrees=degrees, width=400, source=source)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_deadband_drops_small_changes():
+    async def check():
+        # Drop oldest queues every value sent, where coalescing would keep only the newest
+        subscriber = Subscriber("peer", "info", 10, OVERFLOW_DROP_OLDEST, SubscriptionFilter(mid_offset_deadband=5))
+        for id, mid_offset in enumerate([0, 3, -4, 7, 9]):
+            subscriber.put(position(id, mid_offset))
+        vals = [await subscriber.get() for i in range(subscriber.queued)]
+        return [v.mid_offset for v in vals], subscriber.filtered
+
+    offsets, filtered = run(check())
+    assert offsets == [0, 7]
+    assert filtered == 3
+
+
+def test_max_rate_flushes_newest_after_interval():
+    async def check():
+        subscriber = Subscriber("peer", "info", 10, OVERFLOW_COALESCE, SubscriptionFilter(max_rate=20))
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        for id in range(3):
+            subscriber.put(position(id, id * 10))
+        first = await subscriber.get()
+        assert subscriber.queued == 0
+        second = await asyncio.wait_for(subscriber.get(), 1.0)
+        return first.id, second.id, loop.time() - start, subscriber.filtered
+
+    first_id, second_id, secs, filtered = run(check())
+    assert (first_id, second_id) == (0, 2)
+    assert secs >= 0.045
+    assert filtered == 1
+
+
+def test_field_mask_leaves_other_fields_at_defaults():
+    async def check():
+        subscriber = Subscriber("peer", "info", 10, OVERFLOW_COALESCE, SubscriptionFilter(fields=["mid_offset"]))
+        subscriber.put(position(7, -12, source=3))
+        return await subscriber.get()
+
+    val = run(check())
+    assert (val.id, val.source, val.mid_offset) == (7, 3, -12)
+    assert (val.degrees, val.width, val.in_focus) == (0, 0, False)
+
+
+def test_invalid_field_is_rejected():
+    with pytest.raises(ValueError):
+        SubscriptionFilter(fields=["bogus"])
+
+
+def test_source_filter():
+    async def check():
+        subscriber = Subscriber("peer", "info", 10, OVERFLOW_COALESCE, SubscriptionFilter(sources=[2]))
+        subscriber.put(position(0, 1, source=1))
+        subscriber.put(position(1, 2, source=2))
+        return [(await subscriber.get()).source for i in range(subscriber.queued)]
+
+    assert run(check()) == [2]
+
+
+def test_coalesce_keeps_one_value_per_source():
+    async def check():
+        subscriber = Subscriber("peer", "info", 10, OVERFLOW_COALESCE)
+        subscriber.put(position(0, 1, source=1))
+        subscriber.put(position(1, 2, source=2))
+        subscriber.put(position(2, 3, source=1))
+        vals = [await subscriber.get() for i in range(subscriber.queued)]
+        return [(v.source, v.id) for v in vals], subscriber.dropped
+
+    vals, dropped = run(check())
+    assert vals == [(2, 1), (1, 2)]
+    assert dropped == 1
@@ -0,0 +1,67 @@
+import logging
+import queue
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("arc852")
+pytest.importorskip("grpc")
+
+import supervisor
+from supervisor import run_worker
+from supervisor import validate_config
+
+
+class FlakyCamera(object):
+    """
+    Fails its first read, then returns frames with no line in them.
+    """
+
+    def __init__(self, usb_camera=False, frames=3):
+        self.__reads = 0
+        self.__frames = frames
+
+    def is_open(self):
+        return self.__reads <= self.__frames
+
+    def read(self):
+        self.__reads += 1
+        if self.__reads == 1:
+            raise IOError("camera glitch")
+        return np.zeros((240, 320, 3), dtype=np.uint8)
+
+    def close(self):
+        pass
+
+
+def test_valid_config():
+    validate_config([{"usb_camera": True, "core": 1, "width": 320,
+                      "lines": [{"source": 1, "bgr_color": "174, 56, 5", "tracker": "scanlines"},
+                                {"source": 2, "bgr_color": "40, 40, 200", "search_window": True}]}])
+
+
+@pytest.mark.parametrize("workers", [
+    [{"profile": True, "lines": [{"source": 1, "bgr_color": "174, 56, 5"}]}],
+    [{"lines": [{"source": 1, "bgr_color": "174, 56, 5", "workers": 2}]}],
+    [{"lines": [{"source": 1, "bgr_color": "174, 56, 5", "display": True}]}],
+    [{"lines": [{"source": 1, "bgr_color": "174, 56, 5", "usb_camera": True}]}],
+    [{"lines": [{"source": 1}]}],
+    [{"lines": [{"source": 1, "bgr_color": "174, 56, 5"}, {"source": 1, "bgr_color": "40, 40, 200"}]}],
+    [{"lines": []}],
+])
+def test_invalid_config(workers):
+    with pytest.raises(ValueError):
+        validate_config(workers)
+
+
+def test_worker_survives_frame_errors(monkeypatch):
+    monkeypatch.setattr(supervisor, "Camera", FlakyCamera)
+    monkeypatch.setattr(supervisor.time, "sleep", lambda secs: None)
+    positions = queue.Queue()
+    worker = {"lines": [{"source": 4, "bgr_color": "174, 56, 5"}]}
+    run_worker(worker, None, positions, threading.Event(), logging.INFO)
+    sources = []
+    while not positions.empty():
+        sources.append(positions.get()[0])
+    assert sources and set(sources) == {4}